@@ -16,6 +16,9 @@ tickers_dict = {
             "dependent_variable": 'close',
             "independent_variables": ['volume','high','low', 'open'],
             "freq": "D",
+            "ma_windows": [20, 60, 120, 240],
+            "ema_spans": [],
+            "std_windows": [],
             "style_graph": "default",
             "color1": "royalblue",
             "color2": "goldenrod",
@@ -23,6 +26,9 @@ tickers_dict = {
             "color4": "black",
             "color5": "red",
             "p_value_accepted": 0.05,
+            "indep_engine": "arima", # arima, var or vecm
+            "indep_seasonality": "fixed", # fixed (model_parameters s) or spectral
+            "seas_adjust_engine": "x13", # x13 (x13as binary) or native (in-process X-11 style)
             
             "dummy": {
                
@@ -48,6 +54,9 @@ tickers_dict = {
             "dependent_variable": 'close',
             "independent_variables": ['volume', 'high', 'low', 'open'],
             "freq": "MS",
+            "ma_windows": [3, 6, 12, 24],
+            "ema_spans": [],
+            "std_windows": [],
             "style_graph": "default",
             "color1": "royalblue",
             "color2": "goldenrod",
@@ -55,6 +64,9 @@ tickers_dict = {
             "color4": "black",
             "color5": "red",
             "p_value_accepted": 0.05,
+            "indep_engine": "arima", # arima, var or vecm
+            "indep_seasonality": "fixed", # fixed (model_parameters s) or spectral
+            "seas_adjust_engine": "x13", # x13 (x13as binary) or native (in-process X-11 style)
             
             "dummy": {}
             
@@ -76,6 +88,9 @@ tickers_dict = {
             "dependent_variable": 'close',
             "independent_variables": ['volume'],
             "freq": "D",
+            "ma_windows": [20, 60, 120, 240],
+            "ema_spans": [],
+            "std_windows": [],
             "style_graph": "default",
             "color1": "seagreen",
             "color2": "goldenrod",
@@ -83,6 +98,9 @@ tickers_dict = {
             "color4": "black",
             "color5": "red",
             "p_value_accepted": 0.05,
+            "indep_engine": "arima", # arima, var or vecm
+            "indep_seasonality": "fixed", # fixed (model_parameters s) or spectral
+            "seas_adjust_engine": "x13", # x13 (x13as binary) or native (in-process X-11 style)
             
             "dummy": {
                 
@@ -108,6 +126,9 @@ tickers_dict = {
             "dependent_variable": 'close',
             "independent_variables": ['volume'],
             "freq": "MS",
+            "ma_windows": [3, 6, 12, 24],
+            "ema_spans": [],
+            "std_windows": [],
             "style_graph": "default",
             "color1": "seagreen",
             "color2": "goldenrod",
@@ -115,6 +136,9 @@ tickers_dict = {
             "color4": "black",
             "color5": "red",
             "p_value_accepted": 0.05,
+            "indep_engine": "arima", # arima, var or vecm
+            "indep_seasonality": "fixed", # fixed (model_parameters s) or spectral
+            "seas_adjust_engine": "x13", # x13 (x13as binary) or native (in-process X-11 style)
             
             "dummy": {}
             
@@ -129,3 +153,112 @@ tickers_dict = {
 # x13 arima path
 path_x13_arima = "C:/Program Files (x86)/x12arima"
 #path_x13_arima = "/home/x13as/"
+
+# --------------------------------------------------------------------------
+
+# price store (one parquet file per ticker and interval)
+path_price_store = "1_data/0_price_store"
+
+# price source used to fill the store: "yahoo", "local" or "http"
+data_source = "yahoo"
+
+# local source folder (one csv per ticker and interval, e.g. ABEV3.SA_d.csv)
+path_local_source = "1_data/0_local_source"
+
+# http source (same csv layout as the local source, e.g. a local
+# "python -m http.server" started inside path_local_source)
+url_http_source = "http://localhost:8000"
+
+# ingestion: concurrent downloads, retries and backoff (seconds)
+ingest_workers = 8
+ingest_retries = 3
+ingest_backoff = 1.0
+
+# shared price matrix (date-by-ticker memory-mapped planes): Data_input
+# reads the bars from it instead of the per ticker price files. Only the
+# main process maps it, the auto arima workers still receive a pickled
+# copy of each (resampled) series
+use_price_matrix = False
+path_price_matrix = "1_data/0_price_matrix"
+
+# compact frames: float32 prices, integer volume and only the model columns
+# (widened back to float64 only when a SARIMAX model is estimated)
+compact_dtypes = False
+
+# days fetched again before the last stored bar to catch revised values
+refresh_overlap_days = 5
+
+# --------------------------------------------------------------------------
+
+# independent variables forecast: worker processes (one auto arima per
+# column) and BLAS threads per worker (avoids oversubscription)
+indep_workers = 4
+indep_blas_threads = 1
+
+# wall-clock budget (seconds) of the order search of each independent
+# variable, None searches without limit (the budgeted search follows the
+# auto arima stepwise steps, check with python -m benchmarks.arima_search)
+indep_time_budget = None
+
+# also write the independent variables forecast to data_base/_fpred.csv
+# (and the auto arima order search of each variable to _fpred_search.csv)
+export_fpred_csv = True
+
+# trend of the independent variables models: None uses the model chosen by
+# auto arima as it is, any SARIMAX trend ("c", "t", "ct") refits it
+indep_trend = None
+
+# --------------------------------------------------------------------------
+
+# cache folder
+path_cache = "1_data/0_cache"
+
+# hashes of the figures and reports on disk (unchanged ones are skipped)
+path_artifact_manifest = "1_data/0_cache/artifacts.json"
+
+# auto arima orders cache: an unchanged series fits its cached order again,
+# a changed one (e.g. the window grew by one bar) fits the order of its
+# previous version ("reuse", one fit per column until the entry expires
+# with the ttl), searches only around it ("neighbourhood", +/- 1 on p, q,
+# P, Q) or gets a full search ("full")
+arima_cache_mode = "reuse"
+arima_cache_ttl = 7 * 24 * 3600
+arima_cache_max_entries = 5000
+
+# True ignores the cached orders (full search, cache is rewritten)
+arima_cache_force = False
+
+# --------------------------------------------------------------------------
+
+# figures rendered in background processes (0 renders in the main process)
+render_workers = 2
+
+# numbers only run: no figures (matplotlib imports are blocked in the main
+# and worker processes), the numeric outputs (forecasts, intervals, 
+# statistics, ADF, model summary) are kept
+headless = False
+
+# --------------------------------------------------------------------------
+
+# descriptive statistics quantile sketch (items per level, exact up to this
+# number of bars)
+stats_sketch_k = 200
+
+# --------------------------------------------------------------------------
+
+# X-13 ARIMA-SEATS runs at the same time (dependent and independent series)
+x13_workers = 4
+
+# True runs all the X-13 series of a ticker/period in one x13as process
+# (metafile), False runs one process per series
+x13_batch = True
+
+# X-13 results cache (path_cache/x13), least recently used evicted first
+x13_cache_max_entries = 2000
+x13_cache_max_bytes = 500 * 1024 ** 2
+
+# --------------------------------------------------------------------------
+
+# ADF lag: "auto" (AIC search on every test) or "fixed" (lag searched on the
+# level series, reused on its differences)
+adf_lag_mode = "auto"
@@ -1,278 +1,876 @@
-from pandas import to_datetime, read_csv, concat
+from os import makedirs
+from os.path import exists
+from io import StringIO
+from json import load, dump
+from time import sleep
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from requests import Session
+from requests.adapters import HTTPAdapter
+from numpy import load as np_load, save as np_save, nan, float64, float32, int32, uint32, iinfo
+from numpy import ascontiguousarray, isnan
+from numpy.lib.format import open_memmap
+from pandas import to_datetime, read_csv, read_parquet, concat, Timedelta
+from pandas import DataFrame, DatetimeIndex
 from pandas_datareader import data
-from a_config import tickers_dict
+from a_config import tickers_dict, path_price_store, data_source, path_local_source
+from a_config import refresh_overlap_days, url_http_source
+from a_config import ingest_workers, ingest_retries, ingest_backoff
+from a_config import use_price_matrix, path_price_matrix, compact_dtypes
 
 
-class Data_input:
+# columns kept in the price store (same order used by the whole pipeline)
+ohlcv_columns = ['close', 'volume', 'open', 'high', 'low', 'adj close']
+
+# aggregation of the daily bars into lower frequency bars
+ohlcv_aggregation = {
+
+    'close': 'last',
+    'volume': 'sum',
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'adj close': 'last'
+
+}
+
+
+def ohlcv_format(data_entry):
     """
-    Class responsible for inputting data to the model.
+    Standard layout for the price frames (lower case columns and 'index_date').
     """
 
-    def data_input_forecast(self, folder, period):
+    data_entry = data_entry.rename(
+
+        columns = {
+
+            'High' : 'high',
+            'Low': 'low',
+            'Open' : 'open',
+            'Close' : 'close',
+            'Volume' : 'volume',
+            'Adj Close' : 'adj close'
+
+        }
+
+    )
+
+    data_entry.index = to_datetime(data_entry.index)
+    data_entry.index = data_entry.index.rename('index_date')
+
+    data_entry = data_entry.reindex(columns = ohlcv_columns)
+
+    return data_entry
+
+
+def ohlcv_resample(data_entry, freq = 'MS'):
+    """
+    Lower frequency bars (monthly by default) built from the daily bars:
+    first open, max high, min low, last close and summed volume.
+    """
+
+    data_resample = data_entry.resample(freq).agg(ohlcv_aggregation)
+
+    # periods without any daily bar
+    data_resample = data_resample[data_resample['close'].notna()]
+
+    data_resample = data_resample.reindex(columns = ohlcv_columns)
+    data_resample.index = data_resample.index.rename('index_date')
+
+    return data_resample
+
+
+def http_session(pool_size = ingest_workers):
+    """
+    Http session shared by all downloads (one connection pool).
+    """
+
+    session = Session()
+
+    adapter = HTTPAdapter(
+
+        pool_connections = pool_size,
+        pool_maxsize = pool_size
+
+    )
+
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
+
+
+def compact_frame(data_entry, columns):
+    """
+    Compact copy of a price frame: only the given columns, float32 prices
+    and 32 bit integer volume (uint32, or int32 for negative values; kept
+    float32 when it has missing or fractional values or does not fit),
+    each column in its own contiguous array.
+    """
+
+    data_compact = {}
+
+    for col in columns:
+
+        values = data_entry[col].to_numpy(dtype = float64)
+
+        integer = col == 'volume' and len(values) > 0 and not isnan(values).any() and (values % 1 == 0).all()
+
+        if integer and values.min() >= 0 and values.max() <= iinfo(uint32).max:
+            values = values.astype(uint32)
+
+        elif integer and values.min() >= iinfo(int32).min and values.max() <= iinfo(int32).max:
+            values = values.astype(int32)
+
+        else:
+            values = values.astype(float32)
+
+        data_compact[col] = ascontiguousarray(values)
+
+    return DataFrame(data_compact, index = data_entry.index)
+
+
+def widen_frame(data_entry):
+    """
+    Float64 copy of a (compact) frame or series, used at the model fit
+    boundary (SARIMAX, auto arima, VAR/VECM); the read-only stages keep the
+    compact frame.
+    """
+
+    return data_entry.astype(float64)
+
+
+class Yahoo_source:
+    """
+    Remote price source (Yahoo! Finance).
+
+    Optional settings:
+    - session (shared http session)
+
+    """
+
+    def __init__(self, session = None):
         """
-        Data for the prediction of independent variables
+        Settings for the outputs.
         """
-        
-        # variables
-        ticker = tickers_dict[folder][period]['ticker']
-        date_train_init = tickers_dict[folder][period]['date_train_init']
-        date_train_end = tickers_dict[folder][period]['date_train_end']
-        date_predict_init = tickers_dict[folder][period]['date_predict_init']
-        date_predict_end = tickers_dict[folder][period]['date_predict_end']
-        
-        # sample
-        if tickers_dict[folder][period]['freq'] == 'D':
-            
+
+        self.session = session if session is not None else http_session()
+
+
+    def fetch(self, ticker, start, end, interval = 'd'):
+        """
+        Download the OHLCV history of a ticker.
+        """
+
+        if interval == 'd':
+
             data_entry = data.DataReader(
-                
-                ticker, 
-                start = date_train_init, 
-                end = date_predict_end, 
-                data_source = 'yahoo'
-                
+
+                ticker,
+                start = start,
+                end = end,
+                data_source = 'yahoo',
+                session = self.session
+
             )
-        
-        if tickers_dict[folder][period]['freq'] == 'MS':
-            
+
+        else:
+
             data_entry = data.get_data_yahoo(
-                
-                ticker, 
-                start = date_train_init, 
-                end = date_predict_end, 
-                interval = 'm'
-                
+
+                ticker,
+                start = start,
+                end = end,
+                interval = interval,
+                session = self.session
+
             )
-        
-        data_entry = data_entry.rename(
-            
-            columns = {
-                
-                'High' : 'high',
-                'Low': 'low',
-                'Open' : 'open',
-                'Close' : 'close',
-                'Volume' : 'volume',
-                'Adj Close' : 'adj close'
-                
-            }
-            
+
+        return ohlcv_format(data_entry)
+
+
+class Local_source:
+    """
+    File-backed stand-in for the remote source, used to run the pipeline
+    offline.
+
+    Required settings:
+    - path (folder with one csv per ticker and interval: {ticker}_{interval}.csv)
+
+    """
+
+    def __init__(self, path):
+        """
+        Settings for the outputs.
+        """
+
+        self.path = path
+
+
+    def fetch(self, ticker, start, end, interval = 'd'):
+        """
+        Read the OHLCV history of a ticker from disk.
+        """
+
+        data_entry = read_csv(
+
+            f"{self.path}/{ticker}_{interval}.csv",
+            sep = ",",
+            decimal = ".",
+            index_col = 0
+
         )
-        
-        data_entry.index = data_entry.index.rename('index_date')
-        
-        data_entry = data_entry.reindex(
-            
-            columns = [
+
+        data_entry = ohlcv_format(data_entry).sort_index()
+
+        data_entry = data_entry[
+
+            (data_entry.index >= start) &
+            (data_entry.index <= end)
+
+        ]
+
+        return data_entry
+
+
+class Http_source:
+    """
+    Http price source serving the same csv layout as Local_source (a local
+    http server is enough as a stand-in for the remote source).
+
+    Required settings:
+    - url (base url: {url}/{ticker}_{interval}.csv)
+
+    Optional settings:
+    - session (shared http session)
+
+    """
+
+    def __init__(self, url, session = None):
+        """
+        Settings for the outputs.
+        """
+
+        self.url = url.rstrip('/')
+        self.session = session if session is not None else http_session()
+
+
+    def fetch(self, ticker, start, end, interval = 'd'):
+        """
+        Download the OHLCV history of a ticker.
+        """
+
+        response = self.session.get(f"{self.url}/{ticker}_{interval}.csv", timeout = 30)
+        response.raise_for_status()
+
+        data_entry = read_csv(
+
+            StringIO(response.text),
+            sep = ",",
+            decimal = ".",
+            index_col = 0
+
+        )
+
+        data_entry = ohlcv_format(data_entry).sort_index()
+
+        data_entry = data_entry[
+
+            (data_entry.index >= start) &
+            (data_entry.index <= end)
+
+        ]
+
+        return data_entry
+
+
+def price_source():
+    """
+    Price source selected in a_config.
+    """
+
+    if data_source == 'local':
+        return Local_source(path_local_source)
+
+    if data_source == 'http':
+        return Http_source(url_http_source)
+
+    return Yahoo_source()
+
+
+def universe_ranges(tickers):
+    """
+    Date range of daily bars needed by every ticker of a tickers_dict
+    (all periods of a ticker share the same daily file).
+    """
+
+    ranges = {}
+
+    for folder in tickers.keys():
+
+        for period in tickers[folder].keys():
+
+            ticker = tickers[folder][period]['ticker']
+            start = str(to_datetime(tickers[folder][period]['date_train_init']).date())
+            end = str(to_datetime(tickers[folder][period]['date_predict_end']).date())
+
+            if ticker in ranges:
+                start = min(start, ranges[ticker][0])
+                end = max(end, ranges[ticker][1])
+
+            ranges[ticker] = (start, end)
+
+    return ranges
+
+
+class Price_store:
+    """
+    Persistent on-disk OHLCV store, one parquet file per ticker and interval.
+    The price source is only used to fill the store.
+
+    Optional settings:
+    - path (store folder)
+    - source (object with a fetch(ticker, start, end, interval) method)
+
+    """
+
+    def __init__(self, path = path_price_store, source = None):
+        """
+        Settings for the outputs.
+        """
+
+        self.path = path
+        self.source = source if source is not None else price_source()
+
+        if not exists(self.path):
+            makedirs(self.path)
+
+
+    def _file(self, ticker, interval):
+        """
+        Store file of a ticker/interval.
+        """
+
+        return f"{self.path}/{ticker}_{interval}.parquet"
+
+
+    def _read_meta(self, ticker, interval):
+        """
+        Date range already requested from the source for a ticker/interval.
+        """
+
+        file_meta = f"{self.path}/{ticker}_{interval}.json"
+
+        if not exists(file_meta) or not exists(self._file(ticker, interval)):
+            return None
+
+        with open(file_meta, 'r') as meta:
+            return load(meta)
+
+
+    def _write_meta(self, ticker, interval, start, end):
+        """
+        Save the date range covered by a ticker/interval file. The end is
+        never later than today, bars after it may not exist yet.
+        """
+
+        end = min(end, str(date.today()))
+
+        with open(f"{self.path}/{ticker}_{interval}.json", 'w') as meta:
+            dump({'start': start, 'end': end}, meta)
+
+        return
+
+
+    def _fetch(self, ticker, start, end, interval):
+        """
+        Bars from the price source, sorted and without duplicated dates.
+        Failed downloads are retried with exponential backoff.
+        """
+
+        for attempt in range(ingest_retries + 1):
+
+            try:
+                data_entry = self.source.fetch(ticker, start, end, interval)
+                break
+
+            except Exception:
+
+                if attempt == ingest_retries:
+                    raise
+
+                sleep(ingest_backoff * 2 ** attempt)
+
+        data_entry = data_entry[~data_entry.index.duplicated(keep='last')]
+
+        return data_entry.sort_index()
+
+
+    def _merge(self, data_stored, data_fresh):
+        """
+        Merge fresh bars into the stored ones. Returns the merged frame and
+        the number of new and revised rows (rows whose values changed).
+        """
+
+        common = data_stored.index.intersection(data_fresh.index)
+
+        old = data_stored.loc[common, ohlcv_columns]
+        new = data_fresh.loc[common, ohlcv_columns]
+
+        changed = ~((old == new) | (old.isna() & new.isna())).all(axis=1)
+
+        n_revised = int(changed.sum())
+        n_new = len(data_fresh.index.difference(data_stored.index))
+
+        data_merged = concat(
+
+            [
                 
-                'close',
-                'volume',
-                'open',
-                'high',
-                'low',
-                'adj close'
+                data_stored[~data_stored.index.isin(data_fresh.index)],
+                data_fresh
                 
             ]
-            
+
+        ).sort_index()
+
+        return data_merged, n_new, n_revised
+
+
+    def refresh(self, ticker, start, end, interval = 'd'):
+        """
+        Bring a ticker/interval file up to date. Only the bars missing from
+        the store are fetched, plus an overlap window before the last stored
+        bar to catch revisions. Running it twice does not change the store.
+        """
+
+        start = str(to_datetime(start).date())
+        end = str(to_datetime(end).date())
+
+        meta = self._read_meta(ticker, interval)
+
+        # empty store
+        if meta is None:
+
+            data_entry = self._fetch(ticker, start, end, interval)
+
+            data_entry.to_parquet(self._file(ticker, interval))
+            self._write_meta(ticker, interval, start, end)
+
+            return data_entry
+
+        data_entry = read_parquet(self._file(ticker, interval))
+
+        if meta['start'] <= start and meta['end'] >= end:
+            return data_entry
+
+        n_new = 0
+        n_revised = 0
+
+        # gap before the first stored bar
+        if start < meta['start']:
+
+            data_fresh = self._fetch(ticker, start, meta['start'], interval)
+            data_entry, n_new_, n_revised_ = self._merge(data_entry, data_fresh)
+
+            n_new += n_new_
+            n_revised += n_revised_
+
+        # gap after the last stored bar (plus the overlap window)
+        if end > meta['end']:
+
+            if len(data_entry) > 0:
+                last_date = data_entry.index[-1] - Timedelta(days = refresh_overlap_days)
+                start_fetch = str(min(last_date.date(), to_datetime(meta['end']).date()))
+
+            else:
+                start_fetch = meta['start']
+
+            data_fresh = self._fetch(ticker, start_fetch, end, interval)
+            data_entry, n_new_, n_revised_ = self._merge(data_entry, data_fresh)
+
+            n_new += n_new_
+            n_revised += n_revised_
+
+        if n_new > 0 or n_revised > 0:
+            data_entry.to_parquet(self._file(ticker, interval))
+
+        self._write_meta(
+
+            ticker,
+            interval,
+            min(start, meta['start']),
+            max(end, meta['end'])
+
         )
-        
-        data_entry.index = to_datetime(data_entry.index)
-        
+
+        return data_entry
+
+
+    def load(self, ticker, start, end, interval = 'd'):
+        """
+        OHLCV history of a ticker between start and end (inclusive), the
+        store is refreshed first when it does not cover the requested range.
+        """
+
+        data_entry = self.refresh(ticker, start, end, interval)
+
+        data_entry = data_entry[
+
+            (data_entry.index >= str(to_datetime(start).date())) &
+            (data_entry.index <= str(to_datetime(end).date()))
+
+        ]
+
+        return data_entry
+
+
+    def prefetch(self, ranges, max_workers = ingest_workers):
+        """
+        Refresh the daily bars of many tickers concurrently, at most
+        max_workers downloads at the same time.
+
+        Required settings:
+        - ranges (dict ticker -> (start, end), see universe_ranges)
+
+        Returns a dict ticker -> error for the tickers that failed.
+        """
+
+        errors = {}
+
+        with ThreadPoolExecutor(max_workers = max_workers) as executor:
+
+            futures = {
+
+                ticker: executor.submit(self.refresh, ticker, start, end, 'd')
+                for ticker, (start, end) in ranges.items()
+
+            }
+
+            for ticker, future in futures.items():
+
+                try:
+                    future.result()
+
+                except Exception as erro:
+                    errors[ticker] = erro
+
+        return errors
+
+
+class Price_matrix:
+    """
+    Universe of daily bars kept as date-by-ticker NumPy memmaps, one plane
+    per price (close, open, high, low, volume) plus a sidecar date index.
+    Any number of processes can open it and slice it without copying
+    (slice); the pipeline maps it in the main process only (Data_input),
+    frame copies the slices into a pandas frame and the worker processes
+    receive their series pickled.
+
+    Optional settings:
+    - path (matrix folder)
+
+    """
+
+    planes = ['close', 'open', 'high', 'low', 'volume']
+
+    def __init__(self, path = path_price_matrix):
+        """
+        Settings for the outputs.
+        """
+
+        self.path = path
+        self.dates = None
+        self.tickers = None
+        self.data_planes = {}
+
+
+    def build(self, store, ranges):
+        """
+        Write the matrix from the price store.
+
+        Required settings:
+        - store (Price_store)
+        - ranges (dict ticker -> (start, end), see universe_ranges)
+
+        """
+
+        if not exists(self.path):
+            makedirs(self.path)
+
+        data_tickers = {
+
+            ticker: store.load(ticker, start, end, 'd')
+            for ticker, (start, end) in ranges.items()
+
+        }
+
+        tickers = list(data_tickers.keys())
+
+        dates = DatetimeIndex([])
+
+        for data_entry in data_tickers.values():
+            dates = dates.union(data_entry.index)
+
+        for plane in self.planes:
+
+            matrix = open_memmap(
+
+                f"{self.path}/{plane}.npy",
+                mode = 'w+',
+                dtype = float64,
+                shape = (len(dates), len(tickers))
+
+            )
+
+            matrix[:] = nan
+
+            for col, ticker in enumerate(tickers):
+
+                rows = dates.get_indexer(data_tickers[ticker].index)
+                matrix[rows, col] = data_tickers[ticker][plane].values
+
+            matrix.flush()
+            del matrix
+
+        np_save(f"{self.path}/dates.npy", dates.values)
+
+        with open(f"{self.path}/tickers.json", 'w') as file_tickers:
+            dump(tickers, file_tickers)
+
+        return self.open()
+
+
+    def open(self):
+        """
+        Map the matrix read-only (no data is read until it is sliced).
+        """
+
+        self.dates = DatetimeIndex(np_load(f"{self.path}/dates.npy"))
+
+        with open(f"{self.path}/tickers.json", 'r') as file_tickers:
+            self.tickers = load(file_tickers)
+
+        self.data_planes = {
+
+            plane: np_load(f"{self.path}/{plane}.npy", mmap_mode = 'r')
+            for plane in self.planes
+
+        }
+
+        return self
+
+
+    def _rows(self, start, end):
+        """
+        Row range of the dates between start and end (inclusive).
+        """
+
+        row_init = 0 if start is None else self.dates.searchsorted(to_datetime(start), 'left')
+        row_end = len(self.dates) if end is None else self.dates.searchsorted(to_datetime(end), 'right')
+
+        return row_init, row_end
+
+
+    def slice(self, ticker, start = None, end = None, plane = 'close'):
+        """
+        Zero-copy view of one ticker column of a plane between two dates.
+        """
+
+        row_init, row_end = self._rows(start, end)
+
+        return self.data_planes[plane][row_init : row_end, self.tickers.index(ticker)]
+
+
+    def frame(self, ticker, start = None, end = None):
+        """
+        OHLCV frame of a ticker between two dates (dates without bars
+        dropped), a copy of the slices.
+        """
+
+        row_init, row_end = self._rows(start, end)
+
+        data_entry = DataFrame(
+
+            {plane: self.slice(ticker, start, end, plane) for plane in self.planes},
+            index = self.dates[row_init : row_end]
+
+        )
+
+        data_entry = data_entry[data_entry['close'].notna()]
+        data_entry = data_entry.reindex(columns = ohlcv_columns)
+        data_entry.index = data_entry.index.rename('index_date')
+
+        return data_entry
+
+
+class Data_input:
+    """
+    Class responsible for inputting data to the model.
+
+    Optional settings:
+    - store (Price_store, default store from a_config)
+    - matrix (Price_matrix, read instead of the store when given or when
+      use_price_matrix is set in a_config)
+
+    """
+
+    def __init__(self, store = None, matrix = None):
+        """
+        Settings for the outputs.
+        """
+
+        self.store = store if store is not None else Price_store()
+
+        if matrix is None and use_price_matrix:
+            matrix = Price_matrix().open()
+
+        self.matrix = matrix
+
+
+    def data_sample(self, folder, period):
+        """
+        Price history of a ticker/period. Only daily bars are kept in the
+        price store, other frequencies are resampled from them.
+        """
+
+        if self.matrix is not None:
+
+            data_entry = self.matrix.frame(
+
+                tickers_dict[folder][period]['ticker'],
+                tickers_dict[folder][period]['date_train_init'],
+                tickers_dict[folder][period]['date_predict_end']
+
+            )
+
+        else:
+
+            data_entry = self.store.load(
+
+                tickers_dict[folder][period]['ticker'],
+                tickers_dict[folder][period]['date_train_init'],
+                tickers_dict[folder][period]['date_predict_end'],
+                'd'
+
+            )
+
+        if tickers_dict[folder][period]['freq'] != 'D':
+
+            data_entry = ohlcv_resample(
+
+                data_entry,
+                tickers_dict[folder][period]['freq']
+
+            )
+
+        return data_entry
+
+
+    def data_input_forecast(self, folder, period):
+        """
+        Data for the prediction of independent variables
+        """
+
+        # sample
+        data_entry = self.data_sample(folder, period)
+
         # filter for variables
-        data_all_fore = data_entry 
-        
+        data_all_fore = data_entry
+
         dep_var = [tickers_dict[folder][period]['dependent_variable']]
         indep_var = tickers_dict[folder][period]['independent_variables']
-        
+
         vars_slice = dep_var + indep_var
-       
+
         data_all_fore = data_all_fore.loc[ : , vars_slice]
-        
+
+        if compact_dtypes:
+            data_all_fore = compact_frame(data_all_fore, vars_slice)
+
         return data_all_fore
 
 
-    def data_input(self, folder, period):
+    def data_input(self, folder, period, data_f_pred = None, data_sample = None):
         """
         Data input
+
+        Optional settings:
+        - data_f_pred (independent variables forecast, read from _fpred.csv
+          when not given)
+        - data_sample (price history already loaded, e.g. the output of
+          data_input_forecast, read from the store when not given)
+
         """
-        
+
         # variables
-        ticker = tickers_dict[folder][period]['ticker']
         date_train_init = tickers_dict[folder][period]['date_train_init']
-        date_train_end = tickers_dict[folder][period]['date_train_end']
         date_predict_init = tickers_dict[folder][period]['date_predict_init']
         date_predict_end = tickers_dict[folder][period]['date_predict_end']
-        
+
+        dep_var = [tickers_dict[folder][period]['dependent_variable']]
+        indep_var = tickers_dict[folder][period]['independent_variables']
+
+        vars_slice = dep_var + indep_var
+
         # sample
-        if tickers_dict[folder][period]['freq'] == 'D':
-            
-            data_entry = data.DataReader(
-                
-                ticker, 
-                start = date_train_init, 
-                end = date_predict_end, 
-                data_source = 'yahoo'
-                
-            )
-        
-        if tickers_dict[folder][period]['freq'] == 'MS':
-            
-            data_entry = data.get_data_yahoo(
-                
-                ticker, 
-                start = date_train_init, 
-                end = date_predict_end, 
-                interval = 'm'
-                
+        if data_sample is None:
+            data_sample = self.data_sample(folder, period)
+
+        if compact_dtypes:
+            data_sample = compact_frame(data_sample, vars_slice)
+
+        columns = data_sample.columns.to_list()
+
+        if data_f_pred is None:
+
+            data_f_pred = read_csv(
+
+                f"1_data/{folder}/{period}/data_base/{folder}_fpred.csv",
+                sep=",",
+                decimal="."
+
             )
-        
-        data_entry = data_entry.rename(
-            
-            columns = {
-                
-                'High' : 'high',
-                'Low': 'low',
-                'Open' : 'open',
-                'Close' : 'close',
-                'Volume' : 'volume',
-                'Adj Close' : 'adj close'
-                
-            }
-            
-        )
-        
-        data_entry.index = data_entry.index.rename('index_date')
-        
-        data_entry = data_entry.reindex(
-            
-            columns = [
-                
-                'close',
-                'volume',
-                'open',
-                'high',
-                'low',
-                'adj close'
-                
-            ]
-            
-        )
-        
-        data_entry.index = to_datetime(data_entry.index)
-        
-        data_f_pred = read_csv(
-            
-            f"1_data/{folder}/{period}/data_base/{folder}_fpred.csv",
-            sep=",",
-            decimal="."
-            
-        )
-        
-        data_f_pred = data_f_pred.reindex(
-            
-            columns = [
-                
-                'index_date',
-                'close',
-                'volume',
-                'open',
-                'high',
-                'low',
-                'adj close'
-                
-            ]
-            
-        )
-        
-        data_f_pred["index_date"] = to_datetime(data_f_pred["index_date"])
-        data_f_pred = data_f_pred.sort_values("index_date")
-        data_f_pred = data_f_pred.set_index("index_date")
-        
-        data_entry = data_entry[ 
-            
-            (data_entry.index >= date_train_init) & 
-            (data_entry.index < date_predict_init)
-            
+
+            data_f_pred["index_date"] = to_datetime(data_f_pred["index_date"])
+            data_f_pred = data_f_pred.sort_values("index_date")
+            data_f_pred = data_f_pred.set_index("index_date")
+
+        data_f_pred = data_f_pred.reindex(columns = columns)
+
+        data_entry = data_sample[
+
+            (data_sample.index >= date_train_init) &
+            (data_sample.index < date_predict_init)
+
         ]
-        
+
         data_entry = concat([data_entry, data_f_pred])
-        
+
+        if compact_dtypes:
+            data_entry = compact_frame(data_entry, vars_slice)
+
         # sample filter
-        if tickers_dict[folder][period]['freq'] == 'D':
-            
-            data_original = data.DataReader(
-                
-                ticker, 
-                start = date_train_init, 
-                end = date_predict_end, 
-                data_source = 'yahoo'
-                
-            )
-        
-        if tickers_dict[folder][period]['freq'] == 'MS':
-            
-            data_original = data.get_data_yahoo(
-                
-                ticker, 
-                start = date_train_init, 
-                end = date_predict_end, 
-                interval = 'm'
-                
-            )
-        
-        data_original = data_original.rename(
-            
-            columns = {
-                
-                'High' : 'high',
-                'Low': 'low',
-                'Open' : 'open',
-                'Close' : 'close',
-                'Volume' : 'volume',
-                'Adj Close' : 'adj close'
-                
-            }
-            
-        )
-        
-        data_original.index = data_original.index.rename('index_date')
-        
-        data_original = data_original.reindex(
-            
-            columns = [
-                
-                'close',
-                'volume',
-                'open',
-                'high',
-                'low',
-                'adj close'
-                
-            ]
-            
-        )
-        
-        data_original.index = to_datetime(data_original.index)
-        data_original = data_original[data_original.index >= date_train_init].iloc[ : , 0 ]
-        
+        data_original = data_sample[data_sample.index >= date_train_init].iloc[ : , 0 ]
+
         # filter for variables
-        data_train = data_entry[ 
-            
-            (data_entry.index >= date_train_init) & 
+        data_train = data_entry[
+
+            (data_entry.index >= date_train_init) &
             (data_entry.index <= date_predict_end)
-            
+
         ]
-        
+
         # variables
         data_endog = data_train.iloc[ : , 0 : 1 ]
-        
+
         data_exogs = data_train.iloc[ : , 1 :   ][
-            
+
             tickers_dict[folder][period]['independent_variables']
-            
+
         ]
-        
+
         # variable name
         variable_ = list(data_endog.columns.values.tolist())[0]
         variable = variable_.replace("_", ' ').upper()
-        
+
         return (data_endog, data_exogs, variable.lower(), data_original, data_train)
@@ -0,0 +1,118 @@
+"""
+Parity of the budgeted stepwise search (arima_budget_search) with the
+pmdarima auto arima stepwise search: with no time limit both should pick
+the same orders for every independent variable of a_config.
+
+For each column it prints the orders, the AIC and the seconds of both
+searches, and counts the columns whose orders differ.
+
+Run from the repository root:
+    python -m benchmarks.arima_search
+"""
+
+from time import perf_counter
+from pmdarima.arima import auto_arima
+from a_config import tickers_dict
+from b_data_input import Data_input, widen_frame
+from c_pred_indep_var import arima_budget_search, arima_max_order
+
+
+def search_auto(series, s):
+    """
+    Orders, AIC and elapsed seconds of the auto arima search.
+    """
+
+    time_init = perf_counter()
+
+    model = auto_arima(
+
+        series,
+        information_criterion = 'aic',
+        seasonal = True,
+        error_action = "ignore",
+        supress_warnings = True,
+        trace = False,
+        m = s,
+        start_p = 1,
+        start_q = 1,
+        start_P = 1,
+        start_Q = 1,
+        max_p = arima_max_order[0],
+        max_q = arima_max_order[1],
+        max_P = arima_max_order[2],
+        max_Q = arima_max_order[3],
+
+    )
+
+    return model, perf_counter() - time_init
+
+
+def search_budget(series, s):
+    """
+    Orders, AIC and elapsed seconds of the budgeted search (no limit).
+    """
+
+    time_init = perf_counter()
+
+    model, _ = arima_budget_search(series, s, float('inf'))
+
+    return model, perf_counter() - time_init
+
+
+def main():
+    """
+    Parity check of every ticker/period.
+    """
+
+    db = Data_input()
+
+    n_columns = 0
+    mismatches = 0
+
+    for folder in tickers_dict.keys():
+
+        for period in tickers_dict[folder].keys():
+
+            config = tickers_dict[folder][period]
+
+            data_all_fore = db.data_input_forecast(folder, period)
+
+            data_all = widen_frame(data_all_fore[data_all_fore.index <= config['date_train_end']])
+
+            s = config['model_parameters'][6]
+
+            for col in data_all.columns:
+
+                if col == config['dependent_variable']:
+                    continue
+
+                model_auto, elapsed_auto = search_auto(data_all[col], s)
+                model_budget, elapsed_budget = search_budget(data_all[col], s)
+
+                same = (
+
+                    tuple(model_auto.order) == tuple(model_budget.order) and
+                    tuple(model_auto.seasonal_order) == tuple(model_budget.seasonal_order) and
+                    bool(model_auto.with_intercept) == bool(model_budget.with_intercept)
+
+                )
+
+                n_columns += 1
+                mismatches += not same
+
+                print(
+
+                    f"{folder} {period} {col}: "
+                    f"auto {model_auto.order}{model_auto.seasonal_order} aic {model_auto.aic():.2f} ({elapsed_auto:.2f}s) | "
+                    f"budget {model_budget.order}{model_budget.seasonal_order} aic {model_budget.aic():.2f} ({elapsed_budget:.2f}s)"
+                    f"{'' if same else ' <- different'}"
+
+                )
+
+    print(f"{mismatches} of {n_columns} columns with different orders")
+
+    return
+
+
+if __name__ == "__main__":
+    main()
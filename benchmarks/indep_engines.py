@@ -0,0 +1,125 @@
+"""
+Runtime and accuracy of the independent variables forecast engines: one
+auto arima per column (Arima_indep) against one VAR/VECM for the whole
+block (Var_indep), for every ticker/period of a_config.
+
+Accuracy is the MAPE (%) of each forecast column over the prediction
+window, on the dates with observed bars. The benchmark leaves no trace in
+the pipeline outputs: the orders cache is a temporary folder and the
+_fpred.csv export is off.
+
+Run from the repository root:
+    python -m benchmarks.indep_engines
+"""
+
+from tempfile import mkdtemp
+from time import perf_counter
+from a_config import tickers_dict
+from b_data_input import Data_input
+from c_pred_indep_var import Arima_indep, Var_indep
+
+
+def mape(data_f_pred, data_observed, columns):
+    """
+    MAPE (%) per column on the dates with observed bars.
+    """
+
+    dates = data_f_pred.index.intersection(data_observed.index)
+
+    return {
+
+        col: float(
+
+            (abs(data_f_pred.loc[dates, col] - data_observed.loc[dates, col]) /
+             abs(data_observed.loc[dates, col])).mean() * 100
+
+        )
+
+        for col in columns
+
+    }
+
+
+def run_engine(engine, data_all, folder, period, path_orders):
+    """
+    Run one engine, returns the elapsed seconds and the forecast.
+    """
+
+    config = tickers_dict[folder][period]
+
+    settings = (
+
+        data_all,
+        config['dependent_variable'],
+        folder,
+        period,
+        config['date_predict_init'],
+        config['date_predict_end'],
+        config['freq'],
+        config['p_value_accepted']
+
+    )
+
+    time_init = perf_counter()
+
+    # full order search (cached orders ignored, new orders in a temporary cache)
+    if engine == 'arima':
+
+        data_f_pred = Arima_indep(
+
+            *settings,
+            force_search = True,
+            path_orders = path_orders,
+            export_csv = False
+
+        ).auto_arima_model(config['model_parameters'][6])
+
+    else:
+        data_f_pred = Var_indep(*settings, kind = engine, export_csv = False).var_model(config['model_parameters'][6])
+
+    elapsed = perf_counter() - time_init
+
+    return elapsed, data_f_pred
+
+
+def main():
+    """
+    Benchmark of every ticker/period.
+    """
+
+    db = Data_input()
+
+    path_orders = mkdtemp(prefix = 'arima_orders_')
+
+    for folder in tickers_dict.keys():
+
+        for period in tickers_dict[folder].keys():
+
+            config = tickers_dict[folder][period]
+
+            data_all_fore = db.data_input_forecast(folder, period)
+
+            data_all = data_all_fore[data_all_fore.index <= config['date_train_end']]
+
+            data_observed = data_all_fore[
+
+                (data_all_fore.index >= config['date_predict_init']) &
+                (data_all_fore.index <= config['date_predict_end'])
+
+            ]
+
+            for engine in ['arima', 'var', 'vecm']:
+
+                elapsed, data_f_pred = run_engine(engine, data_all, folder, period, path_orders)
+
+                errors = mape(data_f_pred, data_observed, config['independent_variables'])
+
+                errors = ", ".join(f"{col} {error:.2f}%" for col, error in errors.items())
+
+                print(f"{folder} {period} {engine:>5}: {elapsed:8.2f}s | MAPE: {errors}")
+
+    return
+
+
+if __name__ == "__main__":
+    main()
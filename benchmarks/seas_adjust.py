@@ -0,0 +1,113 @@
+"""
+Throughput and agreement of the seasonal adjustment engines: the X-13
+binary (one x13as process per series) against the native X-11 style
+engine (one batched NumPy pass for all the series), for every monthly
+ticker/period of a_config.
+
+Throughput is series per second. Agreement is the mean absolute
+difference (%) between the seasonally adjusted series of both engines,
+overall and on the first/last year (where the native engine uses
+truncated filters instead of the X-13 regARIMA forecasts).
+
+The native engine is also timed on the panel repeated `copies` times, as
+a stand-in for a large monthly universe.
+
+Run from the repository root:
+    python -m benchmarks.seas_adjust
+"""
+
+from time import perf_counter
+from pandas import concat
+from a_config import tickers_dict, path_x13_arima
+from b_data_input import Data_input
+from e_x13arima_seas_adjust import x13_run
+from n_seas_adjust import native_run, seasonal_periods
+
+
+copies = 100
+
+
+def difference(seasadj_x13, seasadj_native, period):
+    """
+    Mean absolute difference (%) overall and on the first/last year.
+    """
+
+    error = (abs(seasadj_native.values - seasadj_x13.values) / abs(seasadj_x13.values)) * 100
+
+    ends = list(error[ : period ]) + list(error[ -period : ])
+
+    return float(error.mean()), float(sum(ends) / len(ends))
+
+
+def main():
+    """
+    Benchmark of every monthly ticker/period.
+    """
+
+    db = Data_input()
+
+    for folder in tickers_dict.keys():
+
+        for period in tickers_dict[folder].keys():
+
+            config = tickers_dict[folder][period]
+
+            if config['freq'] != 'MS':
+                continue
+
+            data_all_fore = db.data_input_forecast(folder, period)
+
+            data_panel = data_all_fore[data_all_fore.index <= config['date_train_end']].dropna()
+
+            n_period = seasonal_periods[config['freq']]
+
+            # x13 (no cache, one process per series)
+            time_init = perf_counter()
+
+            results_x13 = {col: x13_run(data_panel[[col]], path_x13_arima) for col in data_panel.columns}
+
+            elapsed_x13 = perf_counter() - time_init
+
+            # native (one pass)
+            time_init = perf_counter()
+
+            results_native = native_run(data_panel, n_period)
+
+            elapsed_native = perf_counter() - time_init
+
+            # native, large panel
+            data_large = concat([data_panel] * copies, axis = 1, keys = range(copies))
+
+            time_init = perf_counter()
+
+            native_run(data_large, n_period)
+
+            elapsed_large = perf_counter() - time_init
+
+            n_series = len(data_panel.columns)
+
+            print(
+
+                f"{folder} {period}: x13 {n_series / elapsed_x13:8.1f} series/s | "
+                f"native {n_series / elapsed_native:8.1f} series/s | "
+                f"native x{copies} {n_series * copies / elapsed_large:8.1f} series/s"
+
+            )
+
+            for col in data_panel.columns:
+
+                mean_diff, ends_diff = difference(
+
+                    results_x13[col]['seasadj'],
+                    results_native[col]['seasadj'],
+                    n_period
+
+                )
+
+                print(f"    {col}: seasadj difference {mean_diff:.3f}% (first/last year {ends_diff:.3f}%)")
+
+    return
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,465 @@
-from pandas import read_csv, DataFrame, date_range, to_datetime
-from pmdarima.arima import auto_arima
+from os import environ
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from threadpoolctl import threadpool_limits
+from time import perf_counter
+from numpy import asarray, inf, nan
+from pandas import DataFrame, date_range, to_datetime
 from statsmodels.tsa.statespace.sarimax import SARIMAX
+from statsmodels.tsa.api import VAR
+from statsmodels.tsa.vector_ar.vecm import VECM, select_order, select_coint_rank
+from a_config import indep_workers, indep_blas_threads, indep_trend, path_cache
+from a_config import arima_cache_mode, arima_cache_ttl, arima_cache_max_entries
+from a_config import arima_cache_force, indep_time_budget, export_fpred_csv, headless
+from b_data_input import widen_frame
+from i_cache import Disk_cache, fingerprint
+from j_spectral import Spectral_analysis
+from l_render import block_matplotlib
+
+
+# background writer of the optional csv artifacts (outstanding writes
+# are joined with artifact_wait)
+artifact_writer = ThreadPoolExecutor(max_workers = 1)
+artifact_futures = []
+
+# auto arima search limits (maximum p, q, P, Q), also part of the cache key
+arima_max_order = (5, 5, 2, 2)
+
+
+def worker_init(blas_threads, headless = False):
+    """
+    Cap the BLAS/OpenMP threads of a worker process (and keep matplotlib
+    out of it in headless runs).
+    """
+
+    if headless:
+        block_matplotlib()
+
+    for var in ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS']:
+        environ[var] = str(blas_threads)
+
+    threadpool_limits(limits = blas_threads)
+
+    return
+
+
+def arima_budget_search(
+
+    series,
+    s,
+    budget,
+    d = None,
+    D = None,
+    start = (1, 1, 1, 1),
+    max_order = arima_max_order,
+    max_total = 5
+    ):
+    """
+    Stepwise search (AIC) that stops after budget seconds and returns the
+    best model found so far. Same steps as the auto arima stepwise search:
+    the start model, (0, 0, 0, 0), (1, 0, 1, 0), (0, 1, 0, 1) and the model
+    with no intercept, then the first neighbour that improves the AIC
+    becomes the new best. The deadline is also checked inside each fit
+    (optimizer callback), so one slow fit does not overrun the budget; the
+    first model is always fitted. Returns the model and whether the budget
+    was hit.
+    
+    start = initial (p, q, P, Q)
+    max_order = maximum (p, q, P, Q)
+    max_total = maximum p + q + P + Q (auto arima max_order)
+    """
+    
+    # pmdarima is imported in the workers only (it loads matplotlib)
+    from pmdarima.arima import ARIMA, ndiffs, nsdiffs
+    from pmdarima.utils import diff
+    
+    deadline = perf_counter() + budget
+    
+    # differences (as auto arima: D first, d on the seasonally differenced series)
+    if D is None:
+        D = nsdiffs(series, m = s, test = 'ocsb', max_D = 1) if s > 1 else 0
+    
+    if d is None:
+        d = ndiffs(diff(asarray(series), lag = s, differences = D) if D > 0 else series, test = 'kpss', max_d = 2)
+    
+    constant = d + D < 2
+    
+    fitted = {}
+    best_model = None
+    
+    def stop(params):
+        
+        # optimizer callback: abort the fit once the budget ran out
+        if best_model is not None and perf_counter() > deadline:
+            raise TimeoutError("arima search budget")
+    
+    def fit(candidate, intercept):
+        
+        if (candidate, intercept) in fitted:
+            return fitted[candidate, intercept]
+        
+        p, q, P, Q = candidate
+        
+        try:
+            
+            model = ARIMA(
+                
+                order = (p, d, q),
+                seasonal_order = (P, D, Q, s),
+                with_intercept = intercept,
+                suppress_warnings = True
+                
+            ).fit(series, callback = stop)
+            
+            fitted[candidate, intercept] = (model.aic(), model)
+        
+        except Exception:
+            fitted[candidate, intercept] = (inf, None)
+        
+        return fitted[candidate, intercept]
+    
+    def valid(candidate):
+        
+        return (
+            
+            all(0 <= term <= limit for term, limit in zip(candidate, max_order)) and
+            sum(candidate) <= max_total
+            
+        )
+    
+    def neighbours(candidate, intercept):
+        
+        # seasonal terms first, then p and q, then the intercept
+        p, q, P, Q = candidate
+        
+        steps = [
+            
+            (0, 0, -1, 0), (0, 0, 1, 0), (0, 0, 0, -1), (0, 0, 0, 1),
+            (0, 0, -1, -1), (0, 0, -1, 1), (0, 0, 1, -1), (0, 0, 1, 1),
+            (-1, 0, 0, 0), (1, 0, 0, 0), (0, -1, 0, 0), (0, 1, 0, 0),
+            (-1, -1, 0, 0), (-1, 1, 0, 0), (1, -1, 0, 0), (1, 1, 0, 0)
+            
+        ]
+        
+        moves = [
+            
+            ((p + dp, q + dq, P + dP, Q + dQ), intercept) 
+            for dp, dq, dP, dQ in steps
+            
+        ]
+        
+        if constant:
+            moves.append((candidate, not intercept))
+        
+        return moves
+    
+    # non-seasonal series
+    if s <= 1:
+        max_order = tuple(max_order[ : 2 ]) + (0, 0)
+    
+    start = tuple(min(term, limit) for term, limit in zip(start, max_order))
+    
+    initial = [
+        
+        (start, constant),
+        ((0, 0, 0, 0), constant),
+        ((1, 0, 1, 0) if s > 1 else (1, 0, 0, 0), constant),
+        ((0, 1, 0, 1) if s > 1 else (0, 1, 0, 0), constant)
+        
+    ]
+    
+    if constant:
+        initial.append(((0, 0, 0, 0), False))
+    
+    best_aic = inf
+    
+    for position, (candidate, intercept) in enumerate(initial):
+        
+        if position > 0 and perf_counter() > deadline and best_model is not None:
+            return best_model, True
+        
+        if position > 0 and not valid(candidate):
+            continue
+        
+        aic, model = fit(candidate, intercept)
+        
+        if aic < best_aic:
+            best, best_intercept, best_aic, best_model = candidate, intercept, aic, model
+    
+    improved = best_model is not None
+    
+    while improved:
+        
+        improved = False
+        
+        for candidate, intercept in neighbours(best, best_intercept):
+            
+            if perf_counter() > deadline:
+                return best_model, True
+            
+            if not valid(candidate):
+                continue
+            
+            aic, model = fit(candidate, intercept)
+            
+            if aic < best_aic:
+                best, best_intercept, best_aic, best_model = candidate, intercept, aic, model
+                improved = True
+                break
+    
+    if best_model is None:
+        raise ValueError("no ARIMA model could be fitted")
+    
+    return best_model, False
+
+
+def arima_select(series, s, cached = None, mode = 'reuse', budget = None):
+    """
+    Auto arima model of one series. A cached selection of the same series
+    is refitted with no search. The selection of a previous version of the
+    series (e.g. the window grew by one bar) is refitted as it is in mode
+    'reuse', restricts the search to the orders around it in mode
+    'neighbourhood' and is ignored in mode 'full' (full search). With a
+    budget (seconds) the search stops when it runs out and keeps the best
+    model so far. Returns the model, whether the budget was hit and
+    whether a search ran.
+    """
+
+    # pmdarima is imported in the workers only (it loads matplotlib)
+    from pmdarima.arima import auto_arima, ARIMA
+
+    if cached is not None and (cached['series'] == fingerprint(series) or mode == 'reuse'):
+
+        model = ARIMA(
+
+            order = cached['order'],
+            seasonal_order = cached['seasonal_order'],
+            with_intercept = cached['with_intercept'],
+            suppress_warnings = True
+
+        ).fit(series)
+
+        return model, False, False
+
+    if cached is not None and mode == 'neighbourhood':
+
+        p, d, q = cached['order']
+        P, D, Q, _ = cached['seasonal_order']
+
+        max_p, max_q, max_P, max_Q = arima_max_order
+
+        if budget is not None:
+
+            model, budget_hit = arima_budget_search(
+
+                series,
+                s,
+                budget,
+                d = d,
+                D = D,
+                start = (p, q, P, Q),
+                max_order = (min(p + 1, max_p), min(q + 1, max_q), min(P + 1, max_P), min(Q + 1, max_Q))
+
+            )
+
+            return model, budget_hit, True
+
+        model = auto_arima(
+
+            series,
+            information_criterion = 'aic',
+            seasonal = True,
+            error_action = "ignore",
+            supress_warnings = True,
+            trace = False,
+            m = s,
+            d = d,
+            D = D,
+            start_p = max(0, p - 1),
+            start_q = max(0, q - 1),
+            start_P = max(0, P - 1),
+            start_Q = max(0, Q - 1),
+            max_p = min(p + 1, max_p),
+            max_q = min(q + 1, max_q),
+            max_P = min(P + 1, max_P),
+            max_Q = min(Q + 1, max_Q),
+
+        )
+
+        return model, False, True
+
+    if budget is not None:
+
+        model, budget_hit = arima_budget_search(series, s, budget)
+
+        return model, budget_hit, True
+
+    # Best model with auto arima
+    model = auto_arima(
+
+        series,
+        information_criterion = 'aic',
+        seasonal = True,
+        error_action = "ignore",
+        supress_warnings = True,
+        trace = False,
+        m = s,
+        start_p = 1,
+        start_q = 1,
+        start_P = 1,
+        start_Q = 1,
+        max_p = arima_max_order[0],
+        max_q = arima_max_order[1],
+        max_P = arima_max_order[2],
+        max_Q = arima_max_order[3],
+
+    )
+
+    return model, False, True
+
+
+def arima_column(
+
+    series,
+    s,
+    n_forecast,
+    trend = None,
+    cached = None,
+    mode = 'reuse',
+    budget = None
+    ):
+    """
+    Auto arima forecast of one independent variable (runs in a worker
+    process). The forecast comes from the model fitted by auto arima, it is
+    only refitted with SARIMAX when a trend is given.
+    """
+
+    time_init = perf_counter()
+
+    model_select, budget_hit, searched = arima_select(series, s, cached, mode, budget)
+
+    elapsed = perf_counter() - time_init
+
+    order = model_select.order
+    seasonal_order = model_select.seasonal_order
+
+    if trend is None:
+
+        predict = model_select.predict(n_periods = n_forecast)
+
+    else:
+
+        # model
+        model = SARIMAX(
+
+            series,
+            order = order,
+            seasonal_order = seasonal_order,
+            trend = trend
+
+        )
+
+        model_fit = model.fit(disp=False)
+
+        predict = model_fit.get_forecast(n_forecast).predicted_mean
+
+    selection = {
+
+        'order': tuple(order),
+        'seasonal_order': tuple(seasonal_order),
+        'with_intercept': bool(model_select.with_intercept),
+        'series': fingerprint(series)
+
+    }
+
+    search = {'budget_hit': budget_hit, 'elapsed': elapsed, 'searched': searched}
+
+    return asarray(predict), selection, search
+
+
+def exog_forecast_frame(df_exog_pred, forecast_number, dep_var, date_predict_end):
+    """
+    Layout of the independent variables forecast (_fpred.csv content).
+    """
+    
+    df_exog_pred['index_date'] = to_datetime(forecast_number)
+    
+    df_exog_pred = df_exog_pred.sort_values("index_date")
+    
+    df_exog_pred = df_exog_pred.set_index('index_date')
+    
+    df_exog_pred[dep_var] = nan
+    
+    df_exog_pred = df_exog_pred[ df_exog_pred.index <= date_predict_end ]
+    
+    return df_exog_pred
+
+
+def fpred_export(df_exog_pred, folder, period):
+    """
+    Write the independent variables forecast (_fpred.csv) off the main
+    thread. Returns the future of the write.
+    """
+    
+    future = artifact_writer.submit(
+        
+        df_exog_pred.copy().to_csv,
+        f"1_data/{folder}/{period}/data_base/{folder}_fpred.csv",
+        sep = ",",
+        decimal = ".",
+        index_label = "index_date"
+        
+    )
+    
+    artifact_futures.append(future)
+    
+    return future
+
+
+def search_export(search_info, folder, period):
+    """
+    Write the order search of each independent variable (budget hit,
+    elapsed seconds, whether a search ran) next to the forecast
+    (_fpred_search.csv) off the main thread. Returns the future of the
+    write.
+    """
+    
+    data_search = DataFrame.from_dict(search_info, orient = 'index')
+    
+    future = artifact_writer.submit(
+        
+        data_search.to_csv,
+        f"1_data/{folder}/{period}/data_base/{folder}_fpred_search.csv",
+        sep = ",",
+        decimal = ".",
+        index_label = "variable"
+        
+    )
+    
+    artifact_futures.append(future)
+    
+    return future
+
+
+def artifact_wait():
+    """
+    Wait for the outstanding csv writes. Returns the errors of the failed
+    ones.
+    """
+    
+    errors = []
+    
+    for future in artifact_futures:
+        
+        try:
+            future.result()
+        
+        except Exception as erro:
+            errors.append(erro)
+    
+    artifact_futures.clear()
+    
+    return errors
 
 
 class Arima_indep:
@@ -17,6 +476,19 @@ class Arima_indep:
         - frequency
         - p_value_accepted (p-value number accepted)
     
+    Optional settings:
+        - workers (worker processes, one auto arima per column)
+        - blas_threads (BLAS threads per worker)
+        - trend (SARIMAX trend, refits the auto arima model when given)
+        - cache_mode (changed series: "reuse" refits the previous orders,
+          "neighbourhood" searches around them, "full" full search)
+        - force_search (ignore the cached orders)
+        - time_budget (seconds per column, best model so far when it runs out)
+        - seasonality ("fixed" uses s, "spectral" the dominant period of each
+          column, non-seasonal search when no period is significant)
+        - path_orders (auto arima orders cache folder)
+        - export_csv (write the forecast to data_base/_fpred.csv)
+    
     """
 
     def __init__(
@@ -29,7 +501,16 @@ class Arima_indep:
         date_predict_init,
         date_predict_end,
         freq,
-        p_value_accepted = 0.05
+        p_value_accepted = 0.05,
+        workers = indep_workers,
+        blas_threads = indep_blas_threads,
+        trend = indep_trend,
+        cache_mode = arima_cache_mode,
+        force_search = arima_cache_force,
+        time_budget = indep_time_budget,
+        seasonality = 'fixed',
+        path_orders = f"{path_cache}/arima_orders",
+        export_csv = export_fpred_csv
         ):
         """
         Settings for the outputs.
@@ -45,88 +526,338 @@ class Arima_indep:
         self.date_predict_end = date_predict_end
         self.freq = freq
         self.folder_ = indep_variables.replace(" ", "_").lower()
+        self.workers = workers
+        self.blas_threads = blas_threads
+        self.trend = trend
+        self.orders = {}
+        self.export_csv = export_csv
+        
+        # search time budget (seconds per column) and what each search did
+        self.time_budget = time_budget
+        self.search_info = {}
+        
+        # seasonal period: "fixed" (s) or "spectral" (dominant period of each column)
+        self.seasonality = seasonality
+        self.seasonal_periods = {}
+        
+        # auto arima orders cache
+        self.cache_mode = cache_mode
+        self.force_search = force_search
+        
+        self.cache = Disk_cache(
+            
+            path_orders,
+            ttl = arima_cache_ttl,
+            max_entries = arima_cache_max_entries
+            
+        )
 
 
     def auto_arima_model(self, s):
         """
         Function that uses auto arima to find the best parameters for the model, 
         s is an integer giving the periodicity (number of periods in season), 
-        often it is 4 for quarterly data or 12 for monthly data.
+        often it is 4 for quarterly data or 12 for monthly data. Returns the
+        forecast of the independent variables.
         """
         
         df_exog_pred = DataFrame()
         
-        for col in self.data_all.columns.to_list():
+        forecast_number = date_range(
+            
+            start = self.date_predict_init,
+            end = self.date_predict_end,
+            freq = self.freq)
+        
+        # the dependent variable is not forecast here (its column is blank)
+        list_exog_col = [
+            
+            col for col in self.data_all.columns.to_list() 
+            if col != self.dep_var
             
-            # Best model with auto arima
-            model_select = auto_arima(
+        ]
+        
+        # seasonal period of each column
+        for col in list_exog_col:
+            
+            if self.seasonality == 'spectral':
                 
-                self.data_all[col],
-                information_criterion = 'aic',
-                seasonal = True,
-                error_action = "ignore",
-                supress_warnings = True,
-                trace = False,
-                m = s,
-                start_p = 1,
-                start_q = 1,
-                start_P = 1,
-                start_Q = 1,
+                self.seasonal_periods[col] = Spectral_analysis(self.data_all[col]).seasonal_period(
+                    
+                    self.p_value_accepted,
+                    max_period = 2 * s
+                    
+                )
+            
+            else:
+                self.seasonal_periods[col] = s
+        
+        # float64 columns for the fits (the frame itself stays compact)
+        columns = {col: widen_frame(self.data_all[col]) for col in list_exog_col}
+        
+        # cached orders: by series version and search settings (reused as 
+        # they are) and by search settings only (previous version of the 
+        # series, refitted or start of the neighbourhood search)
+        cache_keys = []
+        cached = []
+        
+        for col in list_exog_col:
+            
+            settings = (
+                
+                self.folder,
+                self.period,
+                col,
+                self.seasonal_periods[col],
+                'aic',
+                self.trend,
+                arima_max_order,
+                self.time_budget
                 
             )
             
-            model_select = str(model_select)
+            key_series = fingerprint(*settings, columns[col])
+            key_previous = fingerprint(*settings)
+            
+            cache_keys.append((key_series, key_previous))
+            
+            selection = None
+            
+            if not self.force_search:
+                
+                selection = self.cache.get(key_series)
+                
+                if selection is None and self.cache_mode in ['reuse', 'neighbourhood']:
+                    selection = self.cache.get(key_previous)
+            
+            cached.append(selection)
+        
+        # one process per column, results in column order
+        with ProcessPoolExecutor(
             
-            p = int(model_select[7])
-            q = int(model_select[9])
-            d = int(model_select[11])
-            P = int(model_select[14])
-            D = int(model_select[16])
-            Q = int(model_select[18])
+            max_workers = max(1, min(self.workers, len(list_exog_col))),
+            initializer = worker_init,
+            initargs = (self.blas_threads, headless)
             
-            # model
-            model = SARIMAX(
+        ) as executor:
+            
+            predicts = list(
                 
-                self.data_all[col],
-                order = (p, d, q), 
-                seasonal_order = (P, D, Q, s), 
-                trend = "c"
+                executor.map(
+                    
+                    arima_column,
+                    [columns[col] for col in list_exog_col],
+                    [self.seasonal_periods[col] for col in list_exog_col],
+                    repeat(len(forecast_number)),
+                    repeat(self.trend),
+                    cached,
+                    repeat(self.cache_mode),
+                    repeat(self.time_budget)
+                    
+                )
                 
             )
+        
+        for col, (key_series, key_previous), (predict, selection, search) in zip(list_exog_col, cache_keys, predicts):
             
-            self.model_fit = model.fit(disp=False)
+            df_exog_pred[col] = DataFrame(predict)
             
-            model_result = self.model_fit.summary()
+            # orders chosen by auto arima (cached only after a search, a hit
+            # keeps its creation time, so the ttl still expires it; a search
+            # cut by the budget is only the start of the next neighbourhood
+            # search, it is never refitted as a final selection)
+            self.orders[col] = (selection['order'], selection['seasonal_order'])
             
-            forecast_number = date_range(
+            if search['searched']:
+                
+                if not search['budget_hit']:
+                    self.cache.set(key_series, selection)
                 
-                start = self.date_predict_init,
-                end = self.date_predict_end,
-                freq = self.freq)
+                if not search['budget_hit'] or self.cache_mode == 'neighbourhood':
+                    self.cache.set(key_previous, selection)
             
-            forecast = self.model_fit.get_forecast(len(forecast_number))
+            # budget hit and elapsed seconds
+            self.search_info[col] = search
+        
+        df_exog_pred = exog_forecast_frame(
             
-            predict = forecast.predicted_mean
+            df_exog_pred,
+            forecast_number,
+            self.dep_var,
+            self.date_predict_end
             
-            df_exog_pred[col] = DataFrame(predict)
+        )
+        
+        # optional artifacts (written in the background)
+        if self.export_csv:
+            fpred_export(df_exog_pred, self.folder, self.period)
+            search_export(self.search_info, self.folder, self.period)
+        
+        return df_exog_pred
+
+
+class Var_indep:
+    """
+    Joint forecast of the independent variables with one multivariate
+    model (VAR or VECM) fitted on the whole data block, an alternative to
+    one auto arima per column (Arima_indep).
+    
+    Required settings:
+        - data (dependent and independent variables)
+        - dep_variable (formatted dependent variable)
+        - indep_variable (formatted independent variables)
+        - period
+        - date_predict_init
+        - date_predict_end
+        - frequency
+        - p_value_accepted (p-value number accepted)
+    
+    Optional settings:
+        - kind ("var" or "vecm")
+        - ic (information criterion for the lag order: aic, bic, hqic, fpe)
+        - export_csv (write the forecast to data_base/_fpred.csv)
+    
+    """
+
+    def __init__(
+        
+        self,
+        data,
+        dep_variable,
+        indep_variables,
+        period,
+        date_predict_init,
+        date_predict_end,
+        freq,
+        p_value_accepted = 0.05,
+        kind = 'var',
+        ic = 'aic',
+        export_csv = export_fpred_csv
+        ):
+        """
+        Settings for the outputs.
+        """
+        
+        # config
+        self.data_all = data.dropna()
+        self.dep_var = dep_variable
+        self.folder = indep_variables
+        self.period = period
+        self.p_value_accepted = p_value_accepted
+        self.date_predict_init = date_predict_init
+        self.date_predict_end = date_predict_end
+        self.freq = freq
+        self.kind = kind
+        self.ic = ic
+        self.lag_order = None
+        self.coint_rank = None
+        self.export_csv = export_csv
+
+
+    def var_forecast(self, values, maxlags, n_forecast):
+        """
+        Forecast of a standardized block (VAR on levels, or VECM when the
+        series are cointegrated).
+        """
+        
+        if self.kind == 'vecm':
+            
+            lag = select_order(
+                
+                values,
+                maxlags = maxlags,
+                deterministic = 'ci'
+                
+            ).selected_orders[self.ic]
+            
+            rank = select_coint_rank(
+                
+                values,
+                det_order = 0,
+                k_ar_diff = lag,
+                method = 'trace',
+                signif = self.p_value_accepted
+                
+            ).rank
+            
+            self.lag_order = lag
+            self.coint_rank = rank
+            
+            # no cointegration (or stationary block): VAR on levels
+            if 0 < rank < values.shape[1]:
+                
+                model_fit = VECM(
+                    
+                    values,
+                    k_ar_diff = lag,
+                    coint_rank = rank,
+                    deterministic = 'ci'
+                    
+                ).fit()
+                
+                return model_fit.predict(steps = n_forecast)
+        
+        model = VAR(values)
+        
+        lag = max(1, model.select_order(maxlags).selected_orders[self.ic])
         
-        df_exog_pred['index_date'] = to_datetime(forecast_number)
+        self.lag_order = lag
         
-        df_exog_pred = df_exog_pred.sort_values("index_date")
+        model_fit = model.fit(lag)
         
-        df_exog_pred = df_exog_pred.set_index('index_date')
+        return model_fit.forecast(values[ -lag : ], steps = n_forecast)
+
+
+    def var_model(self, maxlags):
+        """
+        Function that fits one VAR/VECM on all the variables, maxlags is the
+        largest lag order tried by the information criterion (e.g. the 
+        number of periods in season). Returns the forecast of the independent
+        variables.
+        """
+        
+        forecast_number = date_range(
+            
+            start = self.date_predict_init,
+            end = self.date_predict_end,
+            freq = self.freq)
+        
+        # standardized block (volume and prices on the same scale, float64)
+        data = widen_frame(self.data_all)
+        
+        mean = data.mean()
+        std = data.std().replace(0, 1)
+        
+        values = ((data - mean) / std).values
         
-        df_exog_pred[self.dep_var] = ''
+        predict = self.var_forecast(values, maxlags, len(forecast_number))
         
-        df_exog_pred = df_exog_pred[ df_exog_pred.index <= self.date_predict_end ]
+        predict = DataFrame(predict, columns = self.data_all.columns) * std.values + mean.values
         
-        df_exog_pred.to_csv(
+        list_exog_col = [
             
-            f"1_data/{self.folder}/{self.period}/data_base/{self.folder}_fpred.csv",
-            sep = ",",
-            decimal = ".",
-            index_label = "index_date"
+            col for col in self.data_all.columns.to_list() 
+            if col != self.dep_var
+            
+        ]
+        
+        df_exog_pred = DataFrame()
+        
+        for col in list_exog_col:
+            
+            df_exog_pred[col] = predict[col].values
+        
+        df_exog_pred = exog_forecast_frame(
+            
+            df_exog_pred,
+            forecast_number,
+            self.dep_var,
+            self.date_predict_end
             
         )
         
-        return
+        # optional artifact (written in the background)
+        if self.export_csv:
+            fpred_export(df_exog_pred, self.folder, self.period)
+        
+        return df_exog_pred
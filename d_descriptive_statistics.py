@@ -1,9 +1,170 @@
-from matplotlib import pyplot as plt
-from matplotlib import dates as mpl_dates
-from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
-from numpy import absolute as abs
-from numpy.fft import fft
-from numpy import std, var
+from numpy import cumsum, concatenate, full, nan, sqrt, maximum, float64, isnan, where, arange
+from scipy.signal import lfilter
+from pandas import DataFrame
+from json import dump
+from j_spectral import Spectral_analysis
+from k_correlation import Correlation, render_correlogram
+from l_render import render_pool, artifact_manifest
+from m_online_stats import Online_stats
+from a_config import stats_sketch_k, refresh_overlap_days
+
+
+def render_time_serie(spec):
+    """
+    Time series figure (render process).
+    """
+    
+    from matplotlib import pyplot as plt
+    from matplotlib import dates as mpl_dates
+    
+    # style
+    plt.rcParams.update({'font.size': 12})
+    plt.style.use(spec['style_graph'])
+    fig, ax = plt.subplots(1, 1, sharex=False, figsize=( 12 , 6), dpi=300)
+    
+    # set
+    plt.title(spec['title'])
+    
+    # plot
+    ts_plot = plt.plot(spec['data'], linestyle="solid",
+                                    color=spec['color1'], 
+                                    linewidth = 2)
+    
+    # plot config
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_visible(False)
+    ax.spines['left'].set_visible(False) 
+    plt.gcf().autofmt_xdate() # year
+    date_format = mpl_dates.DateFormatter('%b. %Y') # month, year
+    plt.gca().xaxis.set_major_formatter(date_format)
+    plt.xlabel("")
+    plt.ylabel(spec['ylabel'])
+    plt.tight_layout()
+    
+    # save
+    plt.savefig(spec['path'])
+    plt.close(fig)
+    
+    return
+
+
+def render_moving_average(spec):
+    """
+    Moving averages figure (render process).
+    """
+    
+    from matplotlib import pyplot as plt
+    from matplotlib import dates as mpl_dates
+    
+    data_ma = spec['data_ma']
+    
+    # style
+    plt.rcParams.update({'font.size': 12})
+    plt.style.use(spec['style_graph'])
+    fig, ax = plt.subplots(1, 1, sharex=False, figsize=( 12 , 6), dpi=400)
+    
+    # set
+    plt.title(spec['title'])
+    
+    colors = ["orangered", "orange", "deepskyblue", "magenta"]
+    
+    legends = []
+    
+    # ma
+    for number, window in enumerate(spec['windows']):
+        
+        plt.plot(
+            
+            data_ma[f"ma {window}"],
+            linestyle="solid",
+            color=colors[number % len(colors)],
+            linewidth=1
+            
+        )
+        
+        legends.append(f"ma {window}")
+    
+    # ema
+    for number, span in enumerate(spec['ema_spans']):
+        
+        plt.plot(
+            
+            data_ma[f"ema {span}"],
+            linestyle="dashed",
+            color=colors[number % len(colors)],
+            linewidth=1
+            
+        )
+        
+        legends.append(f"ema {span}")
+    
+    # plot
+    ts_plot = plt.plot(spec['data'], linestyle="solid", color='black', 
+                       linewidth = 1)
+    
+    legends.append(spec['label'])
+    
+    # plot legends
+    plt.legend(legends, frameon = False)
+    
+    # plot config
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_visible(False)
+    ax.spines['left'].set_visible(False) 
+    plt.gcf().autofmt_xdate() # year
+    date_format = mpl_dates.DateFormatter('%b. %Y') # month, year
+    plt.gca().xaxis.set_major_formatter(date_format)
+    plt.xlabel("")
+    plt.ylabel(spec['ylabel'])
+    plt.tight_layout()
+    
+    # save
+    plt.savefig(spec['path'])
+    plt.close(fig)
+    
+    return
+
+
+def render_periodogram(spec):
+    """
+    Periodogram figure (render process).
+    """
+    
+    from matplotlib import pyplot as plt
+    
+    # style
+    fig, ax = plt.subplots(1, 1, sharex=True, figsize=(12, 6), dpi=300)
+    plt.rcParams.update({'font.size': 12})
+    plt.style.use(spec['style_graph'])
+    
+    # config
+    plt.title(spec['title'])
+    
+    periodogram = plt.plot(spec['period'], spec['power'], color=spec['color1'], linewidth=1)
+    density = plt.plot(spec['period_welch'], spec['power_welch'], color=spec['color3'], linewidth=2)
+    
+    # dominant periods
+    for period_peak in spec['periods_peak']:
+        plt.axvline(period_peak, color=spec['color4'], linestyle="dotted", linewidth=1)
+    
+    plt.xscale('log')
+    plt.xlabel("period (observations)")
+    plt.legend(["periodogram", "welch"], frameon = False)
+    
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_visible(False)
+    ax.spines['left'].set_visible(False) 
+    
+    plt.tight_layout()
+    
+    # save
+    fig.savefig(spec['path'])
+    plt.close(fig)
+    
+    return
 
 
 class Time_serie_level:
@@ -64,173 +225,144 @@ class Time_serie_level:
         self.color5 = color5
 
 
+    def style(self):
+        """
+        Style settings of the figures.
+        """
+        
+        return {
+            
+            'style_graph': self.style_graph,
+            'ylabel': self.ylabel,
+            'color1': self.color1,
+            'color2': self.color2,
+            'color3': self.color3,
+            'color4': self.color4,
+            'color5': self.color5
+            
+        }
+
+
     def time_serie_plot(self):
         """
         Time series plot.
         """
         
-        # style
-        plt.rcParams.update({'font.size': 12})
-        plt.style.use(self.style_graph)
-        fig, ax = plt.subplots(1, 1, sharex=False, figsize=( 12 , 6), dpi=300)
-        
-        # set
-        plt.title(f"TIME SERIE (LEVEL) - {self.period.upper()} {self.folder.upper()}")
-        
-        # plot
-        ts_plot = plt.plot(self.data_endog, linestyle="solid",
-                                        color=self.color1, 
-                                        linewidth = 2)
-        
-        # plot config
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['bottom'].set_visible(False)
-        ax.spines['left'].set_visible(False) 
-        plt.gcf().autofmt_xdate() # year
-        date_format = mpl_dates.DateFormatter('%b. %Y') # month, year
-        plt.gca().xaxis.set_major_formatter(date_format)
-        plt.xlabel("")
-        plt.ylabel(self.ylabel)
-        plt.tight_layout()
-        
-        # save
-        plt.savefig(f"1_data/{self.folder}/{self.period}/results/{self.folder}_1.0_time_serie_{self.period}.jpg")
+        spec = self.style()
+        
+        spec['data'] = self.data_endog
+        spec['title'] = f"TIME SERIE (LEVEL) - {self.period.upper()} {self.folder.upper()}"
+        spec['path'] = f"1_data/{self.folder}/{self.period}/results/{self.folder}_1.0_time_serie_{self.period}.jpg"
+        
+        render_pool.submit(render_time_serie, spec)
         
         return
 
 
-    def moving_average_d(self):
+    def moving_average_data(self, windows, ema_spans = (), std_windows = ()):
         """
-        Plotting moving averages.
+        Moving averages of any list of windows computed from one cumulative
+        sum of the series, plus optional exponential moving averages (spans)
+        and rolling standard deviations (windows). As rolling(window), a
+        window with a missing bar is missing; the exponential moving
+        averages skip the missing bars and carry the last value over them.
         """
         
-        # style
-        plt.rcParams.update({'font.size': 12})
-        plt.style.use(self.style_graph)
-        fig, ax = plt.subplots(1, 1, sharex=False, figsize=( 12 , 6), dpi=400)
+        values = self.data_endog.values.astype(float64)
+        valid = ~isnan(values)
         
-        # set
-        plt.title(f"MOVING AVERAGE - {self.period.upper()} {self.folder.upper()}")
+        # centered values (precision of the cumulative sums), gaps as 0
+        center = values[valid].mean() if valid.any() else 0.0
+        values_c = where(valid, values - center, 0.0)
         
-        # ma 20
-        ma20 = self.data_endog.rolling(20).mean()
-        plt.plot(ma20, linestyle="solid", color="orangered", linewidth=1)
+        cum_sum = concatenate(([0.0], cumsum(values_c)))
+        cum_count = concatenate(([0], cumsum(valid)))
         
-        # ma 60
-        ma60 = self.data_endog.rolling(60).mean()
-        plt.plot(ma60, linestyle="solid", color="orange", linewidth=1)
+        if std_windows:
+            cum_sum_sq = concatenate(([0.0], cumsum(values_c ** 2)))
         
-        # ma 120
-        ma120 = self.data_endog.rolling(120).mean()
-        plt.plot(ma120, linestyle="solid", color="deepskyblue", linewidth=1)
+        data_ma = {}
         
-        # ma 240
-        ma240 = self.data_endog.rolling(240).mean()
-        plt.plot(ma240, linestyle="solid", color="magenta", linewidth=1)
+        for window in windows:
+            
+            ma = full(len(values), nan)
+            
+            if window <= len(values):
+                
+                full_w = cum_count[window : ] - cum_count[ : -window] == window
+                
+                ma[window - 1 : ] = where(full_w, (cum_sum[window : ] - cum_sum[ : -window]) / window + center, nan)
+            
+            data_ma[f"ma {window}"] = ma
         
-        # plot
-        ts_plot = plt.plot(self.data_endog, linestyle="solid", color='black', 
-                           linewidth = 1)
+        # position of the last valid bar (gaps carry the last average)
+        last_valid = maximum.accumulate(where(valid, arange(len(values)), -1)) if len(values) > 0 else arange(0)
         
-        # plot legends
-        plt.legend(
+        for span in ema_spans:
+            
+            alpha = 2 / (span + 1)
+            
+            ema = full(len(values), nan)
             
-            [
+            if valid.any():
                 
-                "ma 20",
-                "ma 60",
-                "ma 120", 
-                "ma 240",
-                F"{self.folder}"
+                values_valid = values[valid]
                 
-            ],
+                ema[valid], _ = lfilter([alpha], [1, alpha - 1], values_valid, zi = [(1 - alpha) * values_valid[0]])
+                
+                ema = where(last_valid >= 0, ema[last_valid], nan)
             
-            frameon = False
+            data_ma[f"ema {span}"] = ema
+        
+        for window in std_windows:
             
-        )
+            std_roll = full(len(values), nan)
+            
+            if 1 < window <= len(values):
+                
+                full_w = cum_count[window : ] - cum_count[ : -window] == window
+                
+                sum_w = cum_sum[window : ] - cum_sum[ : -window]
+                sum_sq_w = cum_sum_sq[window : ] - cum_sum_sq[ : -window]
+                
+                var_w = (sum_sq_w - sum_w ** 2 / window) / (window - 1)
+                
+                std_roll[window - 1 : ] = where(full_w, sqrt(maximum(var_w, 0)), nan)
+            
+            data_ma[f"std {window}"] = std_roll
         
-        # plot config
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['bottom'].set_visible(False)
-        ax.spines['left'].set_visible(False) 
-        plt.gcf().autofmt_xdate() # year
-        date_format = mpl_dates.DateFormatter('%b. %Y') # month, year
-        plt.gca().xaxis.set_major_formatter(date_format)
-        plt.xlabel("")
-        plt.ylabel(self.ylabel)
-        plt.tight_layout()
-        
-        # save
-        plt.savefig(f"1_data/{self.folder}/{self.period}/results/{self.folder}_1.1_moving_average_{self.period}.jpg")
+        self.data_ma = DataFrame(data_ma, index = self.data_endog.index)
         
-        return
+        return self.data_ma
 
 
-    def moving_average_m(self):
+    def moving_average(self, windows, ema_spans = (), std_windows = ()):
         """
-        Plotting moving averages.
+        Plotting moving averages (and exponential moving averages). The
+        values are also saved in data_base.
         """
         
-        # style
-        plt.rcParams.update({'font.size': 12})
-        plt.style.use(self.style_graph)
-        fig, ax = plt.subplots(1, 1, sharex=False, figsize=( 12 , 6), dpi=400)
-        
-        # set
-        plt.title(f"MOVING AVERAGE - {self.period.upper()} {self.folder.upper()}")
+        data_ma = self.moving_average_data(windows, ema_spans, std_windows)
         
-        # ma 3
-        ma3 = self.data_endog.rolling(3).mean()
-        plt.plot(ma3, linestyle="solid", color="orangered", linewidth=1)
-        
-        # ma 6
-        ma6 = self.data_endog.rolling(6).mean()
-        plt.plot(ma6, linestyle="solid", color="orange", linewidth=1)
-        
-        # ma 12
-        ma12 = self.data_endog.rolling(12).mean()
-        plt.plot(ma12, linestyle="solid", color="deepskyblue", linewidth=1)
-        
-        # ma 24
-        ma24 = self.data_endog.rolling(24).mean()
-        plt.plot(ma24, linestyle="solid", color="magenta", linewidth=1)
-        
-        # plot
-        ts_plot = plt.plot(self.data_endog, linestyle="solid", color='black', 
-                           linewidth = 1)
-        
-        # plot legends
-        plt.legend(
+        data_ma.to_csv(
             
-            [
-                
-                "ma 3",
-                "ma 6",
-                "ma 12", 
-                "ma 24",
-                F"{self.folder}"
-                
-            ],
-            
-            frameon = False
+            f"1_data/{self.folder}/{self.period}/data_base/{self.folder}_moving_average_{self.period}.csv",
+            sep = ",",
+            index_label = "index_date"
             
         )
-        # plot config
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['bottom'].set_visible(False)
-        ax.spines['left'].set_visible(False) 
-        plt.gcf().autofmt_xdate() # year
-        date_format = mpl_dates.DateFormatter('%b. %Y') # month, year
-        plt.gca().xaxis.set_major_formatter(date_format)
-        plt.xlabel("")
-        plt.ylabel(self.ylabel)
-        plt.tight_layout()
-        
-        # save
-        plt.savefig(f"1_data/{self.folder}/{self.period}/results/{self.folder}_1.1_moving_average_{self.period}.jpg")
+        
+        spec = self.style()
+        
+        spec['data'] = self.data_endog
+        spec['data_ma'] = data_ma
+        spec['windows'] = list(windows)
+        spec['ema_spans'] = list(ema_spans)
+        spec['label'] = f"{self.folder}"
+        spec['title'] = f"MOVING AVERAGE - {self.period.upper()} {self.folder.upper()}"
+        spec['path'] = f"1_data/{self.folder}/{self.period}/results/{self.folder}_1.1_moving_average_{self.period}.jpg"
+        
+        render_pool.submit(render_moving_average, spec)
         
         return
 
@@ -240,99 +372,78 @@ class Time_serie_level:
         ACF and PACF plots.
         """
         
-        # style
-        fig, ax = plt.subplots(2, 1, sharex=False, figsize=(12, 6), dpi=300)
-
-        # plot
-        acf = plot_acf(
-            
-            self.data_endog.values.squeeze(),
-            title = f"ACF (LEVEL) - {self.period.upper()} {self.folder.upper()}",
-            color = self.color1,
-            vlines_kwargs = {"colors": self.color1},
-            alpha = 0.05,
-            ax = ax[0],
-            zero = True
-          
-        )
+        # acf and pacf (computed once, also saved in data_base)
+        correlation = Correlation(self.data_endog.values, alpha = 0.05)
         
-        pacf = plot_pacf(
-            
-            self.data_endog.values.squeeze(),
-            title = f"PACF (LEVEL) - {self.period.upper()} {self.folder.upper()}",
-            color = self.color2,
-            vlines_kwargs = {"colors": self.color2},
-            alpha = 0.05,
-            ax = ax[1],
-            zero = True
-         
-        )
-       
-        
-        ax[0].set_ylim(-1.1, 1.1) 
-        ax[1].set_ylim(-1.1, 1.1)
-        ax[0].spines['top'].set_visible(False)
-        ax[0].spines['right'].set_visible(False)
-        ax[0].spines['bottom'].set_visible(False)
-        ax[0].spines['left'].set_visible(False) 
-        ax[0].get_xaxis().set_ticks([])
-        ax[1].spines['top'].set_visible(False)
-        ax[1].spines['right'].set_visible(False)
-        ax[1].spines['bottom'].set_visible(False)
-        ax[1].spines['left'].set_visible(False) 
-        plt.tight_layout()
-        
-        # save
-        fig.savefig(f"1_data/{self.folder}/{self.period}/results/{self.folder}_2_acf_pacf_level_{self.period}.jpg")
+        correlation.export(f"1_data/{self.folder}/{self.period}/data_base/{self.folder}_acf_pacf_level_{self.period}.json")
+        
+        spec = self.style()
+        
+        spec['acf'] = correlation.acf
+        spec['acf_band'] = correlation.acf_band
+        spec['pacf'] = correlation.pacf
+        spec['pacf_band'] = correlation.pacf_band
+        spec['title_acf'] = f"ACF (LEVEL) - {self.period.upper()} {self.folder.upper()}"
+        spec['title_pacf'] = f"PACF (LEVEL) - {self.period.upper()} {self.folder.upper()}"
+        spec['zero'] = True
+        spec['ylim'] = (-1.1, 1.1)
+        spec['path'] = f"1_data/{self.folder}/{self.period}/results/{self.folder}_2_acf_pacf_level_{self.period}.jpg"
+        
+        render_pool.submit(render_correlogram, spec)
         
         return
 
 
-    def periodogram_plot(self):
+    def periodogram_plot(self, max_period = None):
         """
-        Periodogram plot.
+        Periodogram and Welch spectral density of the differenced series,
+        plotted against the period. The dominant periods are saved in
+        data_base.
         """
         
-        # selection
-        self.data_endog = self.data_endog
-        
-        # style
-        fig, ax = plt.subplots(1, 1, sharex=True, figsize=(12, 6), dpi=300)
-        plt.rcParams.update({'font.size': 12})
-        plt.style.use(self.style_graph)
+        spectral = Spectral_analysis(self.data_endog, transform = 'diff')
         
-        # config
-        plt.title(f"PERIODOGRAM (LEVEL) - {self.period.upper()} {self.folder.upper()}")
+        self.data_periods = spectral.dominant_periods(max_period = max_period)
         
-        ps = abs(fft(self.data_endog, n=len(self.data_endog / 4 )))  ** 2
+        self.data_periods.to_csv(
+            
+            f"1_data/{self.folder}/{self.period}/data_base/{self.folder}_dominant_periods_{self.period}.csv",
+            sep = ",",
+            index = False
+            
+        )
         
-        periodogram = plt.plot(ps[1:], color=self.color1)
+        frequency, power = spectral.periodogram()
+        frequency_welch, power_welch = spectral.welch()
         
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['bottom'].set_visible(False)
-        ax.spines['left'].set_visible(False) 
+        spec = self.style()
         
-        plt.tight_layout()
+        spec['period'] = 1 / frequency
+        spec['power'] = power
+        spec['period_welch'] = 1 / frequency_welch
+        spec['power_welch'] = power_welch
+        spec['periods_peak'] = self.data_periods['period'].to_list()
+        spec['title'] = f"PERIODOGRAM (DIFFERENCED) - {self.period.upper()} {self.folder.upper()}"
+        spec['path'] = f"1_data/{self.folder}/{self.period}/results/{self.folder}_3_periodogram_level_{self.period}.jpg"
         
-        # save
-        fig.savefig(f"1_data/{self.folder}/{self.period}/results/{self.folder}_3_periodogram_level_{self.period}.jpg")
+        render_pool.submit(render_periodogram, spec)
         
         return
 
 
     def descriptive_stat(self):
         """
-        Descriptive data analysis
+        Descriptive data analysis (one pass accumulator, the state saved in
+        the "state" folder is updated only with the new bars)
         """
-       
-        # define variables
-        mean = self.data_endog.mean()
-        median = self.data_endog.median()
-        std_sample = std(self.data_endog)
-        variance = var(self.data_endog)
-        lowest = self.data_endog.min()
-        highest = self.data_endog.max()
+        
+        path_state = f"1_data/{self.folder}/{self.period}/state/{self.folder}_descriptive_statistics_{self.period}.json"
+        
+        stats = Online_stats.load(path_state, stats_sketch_k)
+        stats.update_series(self.data_endog, refresh_overlap_days)
+        stats.save(path_state)
+        
+        results = stats.results()
         
         # frame
         results_txt = (
@@ -340,18 +451,22 @@ class Time_serie_level:
             f"{'-' * 50}\n"
             f"Descriptive analysis:\n\n"
             f"Variable: {self.folder} (level)\n"
-            f"Mean: {mean:.2f}\n"
-            f"Median: {median:.2f}\n"
-            f"Sample std: {std_sample:.2f}\n"
-            f"Variance: {variance:.2f}\n"
-            f"Lowest: {lowest:.2f}\n"
-            f"Highest: {highest:.2f}\n"
+            f"Mean: {results['mean']:.2f}\n"
+            f"Median{'' if results['quantiles_exact'] else ' (approximate)'}: {results['median']:.2f}\n"
+            f"Sample std: {results['std']:.2f}\n"
+            f"Variance: {results['variance']:.2f}\n"
+            f"Lowest: {results['lowest']:.2f}\n"
+            f"Highest: {results['highest']:.2f}\n"
+            f"Skewness: {results['skewness']:.2f}\n"
+            f"Kurtosis (excess): {results['kurtosis']:.2f}\n"
             f"{'-' * 50}\n"
           
         )
         
         # export
-        with open(f"1_data/{self.folder}/{self.period}/results/{self.folder}_4_descriptive_statistics_level_{self.period}.txt", 'w') as desc_stat:
-            desc_stat.write(results_txt)
+        artifact_manifest.write_text(f"1_data/{self.folder}/{self.period}/results/{self.folder}_4_descriptive_statistics_level_{self.period}.txt", results_txt)
+        
+        with open(f"1_data/{self.folder}/{self.period}/data_base/{self.folder}_descriptive_statistics_level_{self.period}.json", 'w') as desc_stat:
+            dump({'variable': self.folder, **results}, desc_stat, indent=2)
         
         return
@@ -1,8 +1,299 @@
 from statsmodels.tsa.x13 import x13_arima_analysis as x13a
-from pandas import DataFrame, read_csv, concat, date_range, Series
-from matplotlib import pyplot as plt
-from matplotlib import dates as mpl_dates
-from sys import platform
+from statsmodels import __version__ as statsmodels_version
+from pandas import DataFrame, read_csv, concat, date_range
+from os import makedirs
+from shutil import rmtree
+from subprocess import run
+from tempfile import mkdtemp
+from concurrent.futures import ThreadPoolExecutor, Future
+from a_config import x13_workers, path_cache, x13_cache_max_entries, x13_cache_max_bytes
+from a_config import x13_batch
+from i_cache import Disk_cache, fingerprint
+from n_seas_adjust import native_run, seasonal_periods
+from l_render import render_pool
+
+
+# X-13 runs are external processes: threads only wait for them, every run
+# of every ticker/period shares this bounded pool
+x13_pool = ThreadPoolExecutor(max_workers=x13_workers)
+
+# X-13 options (statsmodels defaults, also part of the cache key)
+x13_options = {
+    
+    'maxorder': (2, 1),
+    'maxdiff': (2, 1),
+    'outlier': True,
+    'trading': False
+    
+}
+
+# statsmodels versions (first, last) whose private X-13 helpers the batch
+# run was checked with
+x13_api_versions = ((0, 10), (0, 14))
+
+
+def x13_key(data, path):
+    """
+    Cache key of an X-13 run (series, frequency, binary and options).
+    """
+    
+    return fingerprint('x13', data, data.index.inferred_freq, path, sorted(x13_options.items()))
+
+
+def x13_run(data, path, cache=None):
+    """
+    X-13 run of one series: seasonally adjusted, trend and irregular 
+    components and the generated spec. Reused from the cache when the 
+    series, its frequency and the options did not change.
+    """
+    
+    key = x13_key(data, path)
+    
+    if cache is not None:
+        
+        cached = cache.get(key)
+        
+        if cached is not None:
+            return cached
+    
+    results = x13a(data, x12path=path, **x13_options)
+    
+    x13_result = {
+        
+        'seasadj': results.seasadj,
+        'trend': results.trend,
+        'irregular': results.irregular,
+        'spec': results.spec
+        
+    }
+    
+    if cache is not None:
+        cache.set(key, x13_result)
+    
+    return x13_result
+
+
+
+def x13_private_api():
+    """
+    Private statsmodels X-13 helpers used by the batch run (binary path, 
+    output reading, error check and output parsing). None when the 
+    installed statsmodels is not one of the checked versions or does not 
+    have them, the batch run then runs every series alone.
+    """
+    
+    try:
+        
+        version = tuple(int(part) for part in statsmodels_version.split('.')[ : 2 ])
+        
+        if not x13_api_versions[0] <= version <= x13_api_versions[1]:
+            return None
+        
+        from statsmodels.tsa import x13
+        
+        return {
+            
+            'check_x12': x13._check_x12,
+            'check_errors': x13._check_errors,
+            'open_and_read': x13._open_and_read,
+            'convert_out_to_series': x13._convert_out_to_series
+            
+        }
+    
+    except (AttributeError, ValueError):
+        return None
+
+
+def x13_batch_run(series, path, cache=None):
+    """
+    X-13 runs of many series (dict name -> frame) in one x13as process: one
+    spec file per series and a metafile listing them (x13as -m), the .d11,
+    .d12 and .d13 outputs are read back per series. Cached series are not 
+    sent, a series whose batch output is missing or has errors is run 
+    again alone (x13_run raises its error), as every series is when the 
+    x13as process fails or the statsmodels helpers are not available 
+    (x13_private_api).
+    """
+    
+    results = {}
+    pending = {}
+    
+    for name, data in series.items():
+        
+        cached = cache.get(x13_key(data, path)) if cache is not None else None
+        
+        if cached is not None:
+            results[name] = cached
+        
+        else:
+            pending[name] = data
+    
+    if len(pending) == 0:
+        return results
+    
+    api = x13_private_api()
+    
+    if api is None:
+        
+        for name, data in pending.items():
+            results[name] = x13_run(data, path, cache)
+        
+        return results
+    
+    makedirs(path_cache, exist_ok=True)
+    folder = mkdtemp(prefix='x13_batch_', dir=path_cache)
+    
+    try:
+        
+        names = list(pending.keys())
+        specs = []
+        
+        for position, name in enumerate(names):
+            
+            spec = x13a(pending[name], x12path=path, speconly=True, **x13_options)
+            specs.append(spec)
+            
+            with open(f"{folder}/series_{position}.spc", 'w') as file_spec:
+                file_spec.write(spec)
+        
+        # metafile: spec file and output file of each series
+        with open(f"{folder}/batch.mta", 'w') as file_meta:
+            
+            for position in range(len(names)):
+                file_meta.write(f"{folder}/series_{position} {folder}/output_{position}\n")
+        
+        process = run([api['check_x12'](path), '-m', f"{folder}/batch"], capture_output=True)
+        
+        # failed batch: every series is run alone
+        failed = process.returncode != 0 or len(process.stderr.strip()) > 0
+        
+        read = api['open_and_read']
+        convert = api['convert_out_to_series']
+        
+        for position, name in enumerate(names):
+            
+            data = pending[name]
+            output = f"{folder}/output_{position}"
+            
+            try:
+                
+                if failed:
+                    raise RuntimeError(process.stderr.decode(errors='replace'))
+                
+                api['check_errors'](read(f"{output}.err"))
+                
+                x13_result = {
+                    
+                    'seasadj': convert(read(f"{output}.d11"), data.index, 'seasadj'),
+                    'trend': convert(read(f"{output}.d12"), data.index, 'trend'),
+                    'irregular': convert(read(f"{output}.d13"), data.index, 'irregular'),
+                    'spec': specs[position]
+                    
+                }
+            
+            except Exception:
+                results[name] = x13_run(data, path, cache)
+                continue
+            
+            if cache is not None:
+                cache.set(x13_key(data, path), x13_result)
+            
+            results[name] = x13_result
+    
+    finally:
+        rmtree(folder, ignore_errors=True)
+    
+    return results
+
+
+def render_x13_results(spec):
+    """
+    X13 results figure (render process).
+    """
+    
+    from matplotlib import pyplot as plt
+    from matplotlib import dates as mpl_dates
+    
+    # style
+    fig, ax = plt.subplots(4, 1, sharex=True, figsize=( 12 , 6), dpi=300)
+    plt.style.use(spec['style_graph'])
+    plt.rcParams.update({'font.size': 12})
+    
+    # plot
+    x13_original = ax[0].plot(spec['data'],
+                             color=spec['color1'])
+    
+    # config
+    ax[0].set_ylabel("original")
+    x13_desazonal = ax[1].plot(spec['seasonal'], color=spec['color1'])
+    
+    ax[1].set_ylabel("seas. adjusted")
+    x13_trend = ax[2].plot(spec['trend'], color=spec['color1'])
+    
+    ax[2].set_ylabel("trend")
+    x13_irreg = ax[3].plot(spec['irregular'], color=spec['color1'])
+    
+    ax[3].set_ylabel("irregular")
+    ax[0].set_title(spec['title'])
+    
+    for axis in ax:
+        
+        axis.spines['top'].set_visible(False)
+        axis.spines['right'].set_visible(False)
+        axis.spines['bottom'].set_visible(False)
+        axis.spines['left'].set_visible(False) 
+        axis.get_yaxis().set_ticks([])
+    
+    plt.gcf().autofmt_xdate() # year
+    date_format = mpl_dates.DateFormatter('%b. %Y') # month, year
+    plt.gca().xaxis.set_major_formatter(date_format) 
+    
+    plt.tight_layout()
+    
+    # save
+    plt.savefig(spec['path'])
+    plt.close(fig)
+    
+    return
+
+
+def render_x13_seasonal_adjustment(spec):
+    """
+    X13 seasonal adjustment figure (render process).
+    """
+    
+    from matplotlib import pyplot as plt
+    from matplotlib import dates as mpl_dates
+    
+    fig, ax = plt.subplots(1, 1, sharex=False, figsize=( 12 , 6), dpi=300)
+    
+    x13_seasonal_plot_raw = plt.plot(spec['data'],
+                                     color=spec['color1'],
+                                     label="original")
+    
+    x13_seasonal_plot = plt.plot(spec['seasonal'],
+                                 color=spec['color2'],
+                                 label="seasonal adjustment")
+    
+    # config
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_visible(False)
+    ax.spines['left'].set_visible(False) 
+    plt.gcf().autofmt_xdate() # year
+    date_format = mpl_dates.DateFormatter('%b. %Y') # month, year
+    plt.gca().xaxis.set_major_formatter(date_format)
+    plt.ylabel(spec['ylabel'])
+    plt.legend(loc=0, frameon=False)
+    plt.title(spec['title'])
+    
+    plt.tight_layout()
+    
+    # save
+    plt.savefig(spec['path'])
+    plt.close(fig)
+    
+    return
 
 
 class X13_arima_desaz:
@@ -30,6 +321,8 @@ class X13_arima_desaz:
     - color3 (color setting)
     - color4 (color setting)
     - color5 (color setting)
+    - engine ("x13" X-13 binary or "native" in-process X-11 style engine)
+    - batch (x13 engine: True runs all the series in one x13as metafile run)
 
     """
 
@@ -51,7 +344,9 @@ class X13_arima_desaz:
         color2="crimson", 
         color3="darkorange", 
         color4="black", 
-        color5="red"
+        color5="red",
+        engine="x13",
+        batch=x13_batch
         
         ):
         """
@@ -80,122 +375,202 @@ class X13_arima_desaz:
         self.color4 = color4
         self.color5 = color5
         
-        # X13-ARIMA-SEATS CONFIG
+        # X13-ARIMA-SEATS CONFIG (runs are lazy: submitted on the first 
+        # request or by x13_submit, cached on disk)
         self.path = path
-        self.x13_desaz = x13a(self.data_endog, x12path=self.path)
+        self.engine = engine
+        self.batch = batch
+        self.x13_future = None
+        self.x13_indep_futures = {}
+        
+        self.cache = Disk_cache(
+            
+            f"{path_cache}/x13",
+            max_entries=x13_cache_max_entries,
+            max_bytes=x13_cache_max_bytes
+            
+        )
 
 
-    def x13_results(self):
+    def x13_submit(self, independent=True):
         """
-        Results obtained with X13-ARIMA-SEATS (dependent variable)
+        Start the X13 runs in background (dependent variable and, optionally,
+        every independent variable), so they run together. The native engine
+        adjusts all the series at once, in process.
         """
         
-        # style
-        fig, ax = plt.subplots(4, 1, sharex=True, figsize=( 12 , 6), dpi=300)
-        plt.style.use(self.style_graph)
-        plt.rcParams.update({'font.size': 12})
-       
-        # x13 results 
-        x13_seasonal = DataFrame(self.x13_desaz.seasadj.values,
-                                 index=self.data_endog.index.values,
-                                 columns=[self.folder])
+        if self.engine == 'native':
+            return self.native_submit()
         
-        x13_trend = DataFrame(self.x13_desaz.trend.values,
-                                 index=self.data_endog.index.values,
-                                 columns=[self.folder])
+        if self.batch:
+            return self.batch_submit()
         
-        x13_irregular = DataFrame(self.x13_desaz.irregular.values,
-                                 index=self.data_endog.index.values,
-                                 columns=[self.folder])
+        if self.x13_future is None:
+            self.x13_future = x13_pool.submit(x13_run, self.data_endog, self.path, self.cache)
         
-        # plot
-        x13_original = ax[0].plot(self.data_endog,
-                                 color=self.color1)
+        if independent:
+            
+            for col in self.data_exogs.columns.to_list():
+                
+                if col not in self.x13_indep_futures:
+                    
+                    self.x13_indep_futures[col] = x13_pool.submit(
+                        
+                        x13_run,
+                        DataFrame(self.data_exogs[col]),
+                        self.path,
+                        self.cache
+                        
+                    )
         
-        # config
-        ax[0].set_ylabel("original")
-        x13_desazonal = ax[1].plot(x13_seasonal, color=self.color1)
+        return
+
+
+    def batch_submit(self):
+        """
+        X13 batch: one metafile run for the dependent and independent series, 
+        its results are split into one future per series.
+        """
+        
+        if self.x13_future is not None:
+            return
         
-        ax[1].set_ylabel("seas. adjusted")
-        x13_trend = ax[2].plot(x13_trend, color=self.color1)
+        name_endog = self.data_endog.columns[0]
+        list_exog_col = self.data_exogs.columns.to_list()
+        
+        series = {('endog', name_endog): self.data_endog}
         
-        ax[2].set_ylabel("trend")
-        x13_irreg = ax[3].plot(x13_irregular, color=self.color1)
+        for col in list_exog_col:
+            series[('exog', col)] = DataFrame(self.data_exogs[col])
+        
+        self.x13_future = Future()
+        self.x13_indep_futures = {col: Future() for col in list_exog_col}
+        
+        def demultiplex(batch_future):
+            
+            try:
+                results = batch_future.result()
+            
+            except Exception as erro:
+                
+                self.x13_future.set_exception(erro)
+                
+                for future in self.x13_indep_futures.values():
+                    future.set_exception(erro)
+                
+                return
+            
+            self.x13_future.set_result(results[('endog', name_endog)])
+            
+            for col, future in self.x13_indep_futures.items():
+                future.set_result(results[('exog', col)])
         
-        ax[3].set_ylabel("irregular")
-        ax[0].set_title(f"X13-ARIMA RESULTS - {self.period.upper()} {self.folder.upper()}")
+        x13_pool.submit(x13_batch_run, series, self.path, self.cache).add_done_callback(demultiplex)
         
-        ax[0].spines['top'].set_visible(False)
-        ax[0].spines['right'].set_visible(False)
-        ax[0].spines['bottom'].set_visible(False)
-        ax[0].spines['left'].set_visible(False) 
-        ax[0].get_yaxis().set_ticks([])
+        return
+
+
+    def native_submit(self):
+        """
+        Native engine: one batched pass over the dependent and independent
+        series (results set as completed futures).
+        """
         
-        ax[1].spines['top'].set_visible(False)
-        ax[1].spines['right'].set_visible(False)
-        ax[1].spines['bottom'].set_visible(False)
-        ax[1].spines['left'].set_visible(False) 
-        ax[1].get_yaxis().set_ticks([])
+        if self.x13_future is not None:
+            return
         
-        ax[2].spines['top'].set_visible(False)
-        ax[2].spines['right'].set_visible(False)
-        ax[2].spines['bottom'].set_visible(False)
-        ax[2].spines['left'].set_visible(False) 
-        ax[2].get_yaxis().set_ticks([])
+        data_panel = concat([self.data_endog, self.data_exogs], axis=1)
         
-        ax[3].spines['top'].set_visible(False)
-        ax[3].spines['right'].set_visible(False)
-        ax[3].spines['bottom'].set_visible(False)
-        ax[3].spines['left'].set_visible(False) 
-        ax[3].get_yaxis().set_ticks([])
+        results = native_run(data_panel, seasonal_periods.get(self.freq, 12))
         
-        plt.gcf().autofmt_xdate() # year
-        date_format = mpl_dates.DateFormatter('%b. %Y') # month, year
-        plt.gca().xaxis.set_major_formatter(date_format) 
+        def done(result):
+            
+            future = Future()
+            future.set_result(result)
+            
+            return future
         
-        plt.tight_layout()
+        self.x13_future = done(results[self.data_endog.columns[0]])
         
-        # save
-        plt.savefig(f"1_data/{self.folder}/{self.period}/results/{self.folder}_5_x13_results_{self.period}.jpg")
+        self.x13_indep_futures = {
+            
+            col: done(results[col]) 
+            for col in self.data_exogs.columns.to_list()
+            
+        }
         
         return
 
 
-    def x13_seasonal_adjustment(self):
+    @property
+    def x13_desaz(self):
         """
-        X13 Seasonal adjustment (dependent variable).
+        X13 results of the dependent variable (waits for the run).
+        """
+        
+        self.x13_submit(independent=False)
+        
+        return self.x13_future.result()
+
+
+    def x13_results(self):
+        """
+        Results obtained with X13-ARIMA-SEATS (dependent variable)
         """
         
-        fig, ax = plt.subplots(1, 1, sharex=False, figsize=( 12 , 6), dpi=300)
+        # x13 results 
+        x13_seasonal = DataFrame(self.x13_desaz['seasadj'].values,
+                                 index=self.data_endog.index.values,
+                                 columns=[self.folder])
         
-        x13_seasonal = DataFrame(self.x13_desaz.seasadj.values,
+        x13_trend = DataFrame(self.x13_desaz['trend'].values,
                                  index=self.data_endog.index.values,
                                  columns=[self.folder])
         
-        x13_seasonal_plot_raw = plt.plot(self.data_endog,
-                                         color=self.color1,
-                                         label="original")
+        x13_irregular = DataFrame(self.x13_desaz['irregular'].values,
+                                 index=self.data_endog.index.values,
+                                 columns=[self.folder])
         
-        x13_seasonal_plot = plt.plot(x13_seasonal,
-                                     color=self.color2,
-                                     label="seasonal adjustment")
+        spec = {
+            
+            'data': self.data_endog,
+            'seasonal': x13_seasonal,
+            'trend': x13_trend,
+            'irregular': x13_irregular,
+            'style_graph': self.style_graph,
+            'color1': self.color1,
+            'title': f"X13-ARIMA RESULTS - {self.period.upper()} {self.folder.upper()}",
+            'path': f"1_data/{self.folder}/{self.period}/results/{self.folder}_5_x13_results_{self.period}.jpg"
+            
+        }
         
-        # config
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['bottom'].set_visible(False)
-        ax.spines['left'].set_visible(False) 
-        plt.gcf().autofmt_xdate() # year
-        date_format = mpl_dates.DateFormatter('%b. %Y') # month, year
-        plt.gca().xaxis.set_major_formatter(date_format)
-        plt.ylabel(self.ylabel)
-        plt.legend(loc=0, frameon=False)
-        plt.title(f"X13-ARIMA SEASONAL ADJUSTMENT - {self.period.upper()} {self.folder.upper()}")
+        render_pool.submit(render_x13_results, spec)
         
-        plt.tight_layout()
+        return
+
+
+    def x13_seasonal_adjustment(self):
+        """
+        X13 Seasonal adjustment (dependent variable).
+        """
         
-        # save
-        plt.savefig(f"1_data/{self.folder}/{self.period}/results/{self.folder}_6_x13_seasonal_adjustment_{self.period}.jpg")
+        x13_seasonal = DataFrame(self.x13_desaz['seasadj'].values,
+                                 index=self.data_endog.index.values,
+                                 columns=[self.folder])
+        
+        spec = {
+            
+            'data': self.data_endog,
+            'seasonal': x13_seasonal,
+            'ylabel': self.ylabel,
+            'color1': self.color1,
+            'color2': self.color2,
+            'title': f"X13-ARIMA SEASONAL ADJUSTMENT - {self.period.upper()} {self.folder.upper()}",
+            'path': f"1_data/{self.folder}/{self.period}/results/{self.folder}_6_x13_seasonal_adjustment_{self.period}.jpg"
+            
+        }
+        
+        render_pool.submit(render_x13_seasonal_adjustment, spec)
         
         # new data frame
         x13_seasonal.to_csv(f"1_data/{self.folder}/{self.period}/data_base/{self.folder}_seasonal_adjustment_{self.period}.csv",
@@ -218,18 +593,12 @@ class X13_arima_desaz:
         
         list_exog_col = self.data_exogs.columns.to_list()
         
-        data_exog_fore = self.data_exogs
+        self.x13_submit()
         
         for col in list_exog_col:
             
-            df_desaz_indep = DataFrame(data_exog_fore[col])
-            
-            desaz_indep_x13 = x13a(
-                
-                df_desaz_indep,
-                x12path = self.path,
-                
-            ).seasadj.values
+            # aligned to the input dates (the native engine drops the gaps)
+            desaz_indep_x13 = self.x13_indep_futures[col].result()['seasadj'].reindex(self.data_exogs.index).values
             
             df_seas_raw = concat(
                 
@@ -1,6 +1,26 @@
 from statsmodels.tsa.stattools import adfuller as adf
-from pandas import read_csv, DataFrame, to_datetime
-from matplotlib import pyplot as plt
+from json import dump
+from a_config import adf_lag_mode
+from i_cache import fingerprint
+from o_unit_root import Integration_order
+from l_render import artifact_manifest
+
+
+def adf_results(adf_test, **extra):
+    """
+    ADF test results as a dict (structured output).
+    """
+    
+    return {
+        
+        **extra,
+        'adf_test': float(adf_test[0]),
+        'p_value': float(adf_test[1]),
+        'lags': int(adf_test[2]),
+        'observations': int(adf_test[3]),
+        'critical_values': {key: float(value) for key, value in adf_test[4].items()}
+        
+    }
 
 
 class Stationarity_diff:
@@ -12,6 +32,10 @@ class Stationarity_diff:
         - variable (formatted dependent variable - "NAME VARIABLE")
         - period
         - p_value_accepted (p-value number accepted)
+    
+    Optional settings:
+        - lag_mode ("auto" AIC lag search on every test, "fixed" lag chosen 
+          on the level series and reused on its differences)
         
     """
 
@@ -21,7 +45,8 @@ class Stationarity_diff:
         data,
         folder,
         period,
-        p_value_accepted=0.05
+        p_value_accepted=0.05,
+        lag_mode=adf_lag_mode
         ):
         """
         Settings for the outputs.
@@ -36,6 +61,43 @@ class Stationarity_diff:
         self.period = period
         self.variable_ = folder.replace(" ", "_").lower()
         self.p_value_accepted = p_value_accepted
+        self.lag_mode = lag_mode
+        
+        # ADF results by (series version, regression, lag policy) and the 
+        # lag chosen on the level of each series (fixed lag mode)
+        self.adf_memo = {}
+        self.fixed_lags = {}
+
+
+    def adf_test(self, data, name, differenced=False, regression='ct'):
+        """
+        ADF test of a series, computed once per series version. The level 
+        always searches the lag (AIC); with the fixed lag mode the 
+        differenced versions reuse the lag found on the level.
+        """
+        
+        if differenced and self.lag_mode == 'fixed' and name in self.fixed_lags:
+            lag_policy = ('fixed', self.fixed_lags[name])
+        
+        else:
+            lag_policy = ('AIC', None)
+        
+        key = fingerprint(data, regression, lag_policy)
+        
+        if key not in self.adf_memo:
+            
+            if lag_policy[0] == 'fixed':
+                self.adf_memo[key] = adf(data, regression=regression, maxlag=lag_policy[1], autolag=None)
+            
+            else:
+                self.adf_memo[key] = adf(data, regression=regression)
+        
+        result = self.adf_memo[key]
+        
+        if not differenced:
+            self.fixed_lags[name] = result[2]
+        
+        return result
 
 
     def adf_teste(self):
@@ -43,7 +105,7 @@ class Stationarity_diff:
         Adf test.
         """
         
-        adf_level = adf(self.data_endog, regression='ct')
+        adf_level = self.adf_test(self.data_endog, self.folder)
         
         adf_level_result = (
             
@@ -62,8 +124,10 @@ class Stationarity_diff:
             
         )
         
-        with open(f"1_data/{self.folder}/{self.period}/results/{self.folder}_7_adf_test_level_{self.period}.txt", 'w') as desc_stat:
-            desc_stat.write(adf_level_result)
+        artifact_manifest.write_text(f"1_data/{self.folder}/{self.period}/results/{self.folder}_7_adf_test_level_{self.period}.txt", adf_level_result)
+        
+        with open(f"1_data/{self.folder}/{self.period}/data_base/{self.folder}_adf_test_level_{self.period}.json", 'w') as adf_json:
+            dump(adf_results(adf_level, variable=self.folder), adf_json, indent=2)
         
         return
 
@@ -79,8 +143,8 @@ class Stationarity_diff:
         
         while True:
             
-            adf_test_diff = adf(self.data_endog, regression='ct')
-            adf_p_value = adf_test_diff[1]
+            adf_diff = self.adf_test(self.data_endog, self.folder, differenced=count_diff > 0)
+            adf_p_value = adf_diff[1]
             
             if adf_p_value > self.p_value_accepted:
                 stationary_series = self.data_endog.diff().fillna(value=0)
@@ -88,7 +152,6 @@ class Stationarity_diff:
                 count_diff += 1
             
             else:
-                adf_diff = adf(self.data_endog, regression='ct')
                 
                 adf_result = (
                 
@@ -108,8 +171,10 @@ class Stationarity_diff:
                 
                 )
                 
-                with open(f"1_data/{self.folder}/{self.period}/results/{self.folder}_8_adf_diff_result_{self.period}.txt", 'w') as desc_stat:
-                    desc_stat.write(adf_result)
+                artifact_manifest.write_text(f"1_data/{self.folder}/{self.period}/results/{self.folder}_8_adf_diff_result_{self.period}.txt", adf_result)
+                
+                with open(f"1_data/{self.folder}/{self.period}/data_base/{self.folder}_adf_diff_result_{self.period}.json", 'w') as adf_json:
+                    dump(adf_results(adf_diff, variable=self.folder, differences=count_diff), adf_json, indent=2)
                 
                 break
         
@@ -118,26 +183,27 @@ class Stationarity_diff:
 
     def independent_var_stationarity(self):
         """
-        Treatment of stationarity of independent variables.
+        Treatment of stationarity of independent variables (all the columns 
+        tested and differenced together, batched ADF).
         """
         
-        list_exog_col = self.data_all.columns.to_list()
-        
-        for col in list_exog_col:
+        integration = Integration_order(
             
-            while True:
-                
-                adf_test_diff = adf(self.data_all[col].fillna(value=0), regression='ct')
-                adf_p_value = adf_test_diff[1]
-                
-                if adf_p_value > self.p_value_accepted:
-                    stat_col = self.data_all[col].diff().fillna(value=0)
-                    self.data_all[col] = stat_col
-                
-                else:
-                    break
+            self.data_all,
+            self.p_value_accepted,
+            lag_mode=self.lag_mode
+            
+        )
+        
+        self.data_all = integration.stationary()
         
         self.data_all.to_csv(f"1_data/{self.folder}/{self.period}/data_base/{self.folder}_stationary_{self.period}.csv")
         
+        integration.results().to_csv(
+            
+            f"1_data/{self.folder}/{self.period}/data_base/{self.folder}_integration_order_{self.period}.csv",
+            index=False
+            
+        )
+        
         return
-
@@ -1,12 +1,267 @@
-from pandas import DataFrame, read_csv, concat, to_datetime
-from matplotlib import pyplot as plt
-from matplotlib import dates as mpl_dates
-from matplotlib.dates import DateFormatter
-from matplotlib.pyplot import fill_between
+from pandas import DataFrame, concat, to_datetime
 from statsmodels.tsa.statespace.sarimax import SARIMAX
-from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
 from sklearn.metrics import r2_score
-from numpy import arange
+from json import dump
+from b_data_input import widen_frame
+from k_correlation import Correlation, render_correlogram
+from l_render import render_pool, artifact_manifest
+
+
+def render_residuals(spec):
+    """
+    Residuals time serie figure (render process).
+    """
+    
+    from matplotlib import pyplot as plt
+    from matplotlib import dates as mpl_dates
+    
+    # style
+    plt.rcParams.update({'font.size': 12})
+    plt.style.use(spec['style_graph'])
+    fig, ax = plt.subplots(1, 1, sharex=False, figsize=( 12 , 6), dpi=300)
+    
+    # set
+    plt.title(spec['title'])
+    
+    # plot
+    ts_plot = plt.plot(
+        
+        spec['resid'],
+        linestyle="solid",
+        color=spec['color2'], 
+        linewidth = 2
+        
+    )
+    
+    # plot config
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_visible(False)
+    ax.spines['left'].set_visible(False) 
+    plt.gcf().autofmt_xdate() # year
+    date_format = mpl_dates.DateFormatter('%b. %Y') # month, year
+    plt.gca().xaxis.set_major_formatter(date_format)
+    plt.xlabel("")
+    
+    plt.tight_layout()
+    
+    #save
+    plt.savefig(spec['path'])
+    plt.close(fig)
+    
+    return
+
+
+def render_residuals_distribution(spec):
+    """
+    Residuals frequency distribution figure (render process).
+    """
+    
+    from matplotlib import pyplot as plt
+    
+    fig, ax = plt.subplots(1, 1)
+    plt.style.use(spec['style_graph'])
+    plt.rcParams["figure.figsize"] = [12, 6]
+    plt.rcParams["figure.dpi"] = 300
+    
+    resid_plot_fd = spec['resid'].plot(
+        
+        color=spec['color2'],
+        kind='hist',
+        legend=False
+        
+    )
+    
+    plt.title(spec['title'])
+    
+    # config
+    plt.grid(False)
+    resid_plot_fd.spines['top'].set_visible(False)
+    resid_plot_fd.spines['right'].set_visible(False)
+    resid_plot_fd.spines['bottom'].set_visible(False)
+    resid_plot_fd.spines['left'].set_visible(False)
+    
+    plt.tight_layout()
+    
+    # save (pandas may open its own figure)
+    plt.savefig(spec['path'])
+    plt.close('all')
+    
+    return
+
+
+def render_forecast_m(spec):
+    """
+    Observed x fitted + predict figure, monthly (render process).
+    """
+    
+    from matplotlib import pyplot as plt
+    from matplotlib import dates as mpl_dates
+    
+    df_data_all = spec['data_all']
+    conf_95 = spec['conf_95']
+    conf_50 = spec['conf_50']
+    folder = spec['folder']
+    date_predict_init = spec['date_predict_init']
+    
+    # plot config
+    fig, ax = plt.subplots(1, 1, sharex=True, figsize=(12 , 6), dpi=300)
+    plt.rcParams.update({'font.size': 12})
+    plt.style.use(spec['style_graph'])
+    
+    # fitted
+    fitted = df_data_all[f"{folder}_fitted"]
+    fitted[fitted.index == date_predict_init] = df_data_all[df_data_all.index == date_predict_init][f"{folder}_predicted"]
+    plt.plot(fitted, color=spec['color2'])
+    
+    # forecast
+    plt.plot(df_data_all[f"{folder}_predicted"], color=spec['color3'])
+    
+    # plot original
+    observed = spec['data_original'].plot(
+        
+        title=spec['title'],
+        xlabel="",
+        ylabel="",
+        color=spec['color1'],
+        figsize=(12, 6)
+        
+    )
+    
+    # plot confidence interval
+    predict_conf_95 = plt.fill_between(
+        
+        conf_95.index,
+        conf_95.iloc[ : , 0 ],
+        conf_95.iloc[ : , 1 ],
+        color=spec['color4'],
+        alpha=0.05
+        
+    )
+    
+    predict_conf_50 = plt.fill_between(
+        
+        conf_50.index,
+        conf_50.iloc[ : , 0 ],
+        conf_50.iloc[ : , 1 ],
+        color=spec['color4'],
+        alpha=0.1
+        
+    )
+    
+    # plot legends
+    plt.legend(
+        
+        [
+            
+            f"fitted model (R² = {spec['r2']:.2f}%)",
+            f"forecast",
+            f"observed",
+            f"conf. int. 95%", 
+            f"conf. int. 50%"
+            
+        ],
+        
+        frameon = False
+        
+    )
+    
+    # config
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_visible(False)
+    ax.spines['left'].set_visible(False)
+    
+    plt.gcf().autofmt_xdate()
+    date_format = mpl_dates.DateFormatter('%b. %Y')
+    plt.gca().xaxis.set_major_formatter(date_format)
+    plt.xlabel("")
+    plt.ylabel(spec['ylabel'])
+    plt.tight_layout()
+    
+    # save fig (pandas may open its own figure)
+    plt.savefig(spec['path'])
+    plt.close('all')
+    
+    return
+
+
+def render_forecast_d(spec):
+    """
+    Observed x fitted + predict figure, daily (render process).
+    """
+    
+    from matplotlib import pyplot as plt
+    from matplotlib import dates as mpl_dates
+    
+    df_data_all = spec['data_all']
+    data_endog = spec['data_endog']
+    folder = spec['folder']
+    date_predict_init = spec['date_predict_init']
+    
+    # plot config
+    fig, ax = plt.subplots(1, 1, sharex=True, figsize=(12 , 6), dpi=300)
+    plt.rcParams.update({'font.size': 12})
+    plt.style.use(spec['style_graph'])
+    
+    # plot original
+    num_plot = int( ( len(spec['data_original'] ) // 6) * -1)
+    data_original = spec['data_original'].iloc[ num_plot: ]
+    
+    observed = data_original.iloc[ num_plot: ].plot(
+        
+        title=spec['title'],
+        xlabel="",
+        ylabel="",
+        color=spec['color1'],
+        figsize=(12, 6)
+        
+    )
+    
+    # plot fitted
+    fitted = data_endog.iloc[ num_plot: , 1 ]
+    fitted2 = df_data_all[df_data_all.index == date_predict_init]
+    fitted2 = concat([fitted, fitted2[f'{folder.lower()}_predicted']])
+    date_slice_plot = data_original.index[0]
+    fitted2 = fitted2[(fitted2.index >= date_slice_plot)]
+    
+    fitted2 = fitted2.plot(xlabel="", ylabel="", color=spec['color2'])
+    
+    # predicted plot
+    predicted = df_data_all[f"{folder.lower()}_predicted"].plot(color=spec['color3'])
+    
+    # plot legends
+    plt.legend(
+        
+        [
+            
+            f"observed",
+            f"fitted model (R² = {spec['r2']:.2f}%)",
+            f"forecast"
+            
+        ],
+        
+        frameon = False
+        
+    )
+    
+    # plot config
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_visible(False)
+    ax.spines['left'].set_visible(False)
+    plt.gcf().autofmt_xdate()
+    date_format = mpl_dates.DateFormatter('%b. %Y')
+    plt.gca().xaxis.set_major_formatter(date_format)
+    plt.xlabel("")
+    plt.ylabel(spec['ylabel'])
+    plt.tight_layout()
+    
+    # save fig (pandas may open its own figure)
+    plt.savefig(spec['path'])
+    plt.close('all')
+    
+    return
 
 
 class Model_execute:
@@ -53,9 +308,9 @@ class Model_execute:
         """
         
         # data frame
-        self.data_endog = data.iloc[ : , 0 : 1 ]
-        self.data_exogs = data.iloc[ : , 1 :   ]
-        self.data_exogs_fore = data_exogs_fore.iloc[ : , 1 :   ]
+        self.data_endog = widen_frame(data.iloc[ : , 0 : 1 ])
+        self.data_exogs = widen_frame(data.iloc[ : , 1 :   ])
+        self.data_exogs_fore = widen_frame(data_exogs_fore.iloc[ : , 1 :   ])
         self.data_original = data_original
         
         # configs
@@ -104,49 +359,74 @@ class Model_execute:
         
         model_result = self.model_fit.summary()
         
-        with open(f"1_data/{self.folder}/{self.period}/results/{self.folder}_9_model_summary_{self.period}.txt", 'w') as desc_stat:
-            desc_stat.write(str(model_result))
+        artifact_manifest.write_text(f"1_data/{self.folder}/{self.period}/results/{self.folder}_9_model_summary_{self.period}.txt", str(model_result))
+        
+        # structured summary (coefficients and information criteria)
+        summary_json = {
+            
+            'variable': self.folder,
+            'order': [p, d, q],
+            'seasonal_order': [P, D, Q, s],
+            'nobs': int(self.model_fit.nobs),
+            'log_likelihood': float(self.model_fit.llf),
+            'aic': float(self.model_fit.aic),
+            'bic': float(self.model_fit.bic),
+            'hqic': float(self.model_fit.hqic),
+            'params': {
+                
+                name: {
+                    
+                    'coef': float(self.model_fit.params[name]),
+                    'std_err': float(self.model_fit.bse[name]),
+                    'p_value': float(self.model_fit.pvalues[name])
+                    
+                }
+                
+                for name in self.model_fit.params.index
+                
+            }
+            
+        }
+        
+        with open(f"1_data/{self.folder}/{self.period}/data_base/{self.folder}_model_summary_{self.period}.json", 'w') as desc_stat:
+            dump(summary_json, desc_stat, indent=2)
         
         return
 
 
+    def style(self):
+        """
+        Style settings sent with the figures.
+        """
+        
+        return {
+            
+            'style_graph': self.style_graph,
+            'ylabel': self.ylabel,
+            'color1': self.color1,
+            'color2': self.color2,
+            'color3': self.color3,
+            'color4': self.color4,
+            'color5': self.color5
+            
+        }
+
+
     def ts_residuals_plot(self):
         """
         Residuals time serie plot.
         """
         
-        # style
-        plt.rcParams.update({'font.size': 12})
-        plt.style.use(self.style_graph)
-        fig, ax = plt.subplots(1, 1, sharex=False, figsize=( 12 , 6), dpi=300)
-        
-        # set
-        plt.title(f"RESIDUALS - {self.period.upper()} {self.folder.upper()}")
-        
-        # plot
-        ts_plot = plt.plot(
+        spec = {
             
-            self.resid,
-            linestyle="solid",
-            color=self.color2, 
-            linewidth = 2
+            **self.style(),
+            'resid': self.resid,
+            'title': f"RESIDUALS - {self.period.upper()} {self.folder.upper()}",
+            'path': f"1_data/{self.folder}/{self.period}/results/{self.folder}_10_residuals_(time_serie)_{self.period}.jpg"
             
-        )
-        
-        # plot config
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['bottom'].set_visible(False)
-        ax.spines['left'].set_visible(False) 
-        plt.gcf().autofmt_xdate() # year
-        date_format = mpl_dates.DateFormatter('%b. %Y') # month, year
-        plt.gca().xaxis.set_major_formatter(date_format)
-        plt.xlabel("")
+        }
         
-        plt.tight_layout()
-        
-        #save
-        plt.savefig(f"1_data/{self.folder}/{self.period}/results/{self.folder}_10_residuals_(time_serie)_{self.period}.jpg")
+        render_pool.submit(render_residuals, spec)
         
         return 
 
@@ -156,32 +436,16 @@ class Model_execute:
         Analysis of model residuals.
         """
         
-        fig, ax = plt.subplots(1, 1)
-        plt.style.use(self.style_graph)
-        plt.rcParams["figure.figsize"] = [12, 6]
-        plt.rcParams["figure.dpi"] = 300
-        
-        resid_plot_fd = self.resid.plot(
+        spec = {
             
-            color=self.color2,
-            kind='hist',
-            legend=False
+            **self.style(),
+            'resid': self.resid,
+            'title': f"RESIDUALS - {self.period.upper()} {self.folder.upper()}",
+            'path': f"1_data/{self.folder}/{self.period}/results/{self.folder}_11_residuals_(frequency_distribution)_{self.period}.jpg"
             
-        )
-        
-        plt.title(f"RESIDUALS - {self.period.upper()} {self.folder.upper()}")
-        
-        # config
-        plt.grid(False)
-        resid_plot_fd.spines['top'].set_visible(False)
-        resid_plot_fd.spines['right'].set_visible(False)
-        resid_plot_fd.spines['bottom'].set_visible(False)
-        resid_plot_fd.spines['left'].set_visible(False)
+        }
         
-        plt.tight_layout()
-        
-        # save
-        plt.savefig(f"1_data/{self.folder}/{self.period}/results/{self.folder}_11_residuals_(frequency_distribution)_{self.period}.jpg")
+        render_pool.submit(render_residuals_distribution, spec)
         
         return
 
@@ -191,51 +455,28 @@ class Model_execute:
         Residuals ACF and PACF.
         """
         
-        fig, ax = plt.subplots(2, 1, sharex=False, figsize=( 12 , 6), dpi=300)
+        # acf and pacf (computed once, also saved in data_base)
+        correlation = Correlation(self.resid.values, alpha = 0.02)
         
-        acf = plot_acf(
-            
-            self.resid.values.squeeze(),
-            title = f"ACF (RESIDUALS) - {self.period.upper()} {self.folder.upper()}",
-            color = self.color1,
-            vlines_kwargs = {"colors": self.color1},
-            use_vlines = True,
-            alpha = 0.02,
-            ax = ax[0],
-            zero = False
-            
-        )
+        correlation.export(f"1_data/{self.folder}/{self.period}/data_base/{self.folder}_acf_pacf_residuals_{self.period}.json")
         
-        pacf = plot_pacf(
+        spec = {
             
-            self.resid.values.squeeze(),
-            title = f"PACF (RESIDUALS) - {self.period.upper()} {self.folder.upper()}",
-            color = self.color2,
-            vlines_kwargs = {"colors": self.color2},
-            use_vlines = True,
-            alpha = 0.02,
-            ax = ax[1],
-            zero = False
+            'acf': correlation.acf,
+            'acf_band': correlation.acf_band,
+            'pacf': correlation.pacf,
+            'pacf_band': correlation.pacf_band,
+            'title_acf': f"ACF (RESIDUALS) - {self.period.upper()} {self.folder.upper()}",
+            'title_pacf': f"PACF (RESIDUALS) - {self.period.upper()} {self.folder.upper()}",
+            'color1': self.color1,
+            'color2': self.color2,
+            'zero': False,
+            'ylim': (-0.5, 0.5),
+            'path': f"1_data/{self.folder}/{self.period}/results/{self.folder}_12_residuals_(acf_and_pacf)_{self.period}.jpg"
             
-        )
-        
-        # config
-        ax[0].set_ylim(-0.5, 0.5) 
-        ax[1].set_ylim(-0.5, 0.5)
-        ax[0].spines['top'].set_visible(False)
-        ax[0].spines['right'].set_visible(False)
-        ax[0].spines['bottom'].set_visible(False)
-        ax[0].spines['left'].set_visible(False) 
-        ax[0].get_xaxis().set_ticks([])
-        ax[1].spines['top'].set_visible(False)
-        ax[1].spines['right'].set_visible(False)
-        ax[1].spines['bottom'].set_visible(False)
-        ax[1].spines['left'].set_visible(False) 
+        }
         
-        plt.tight_layout()
-        
-        # save
-        plt.savefig(f"1_data/{self.folder}/{self.period}/results/{self.folder}_12_residuals_(acf_and_pacf)_{self.period}.jpg")
+        render_pool.submit(render_correlogram, spec)
         
         return
     
@@ -337,83 +578,22 @@ class Model_execute:
             
         )
         
-        # plot config
-        fig, ax = plt.subplots(1, 1, sharex=True, figsize=(12 , 6), dpi=300)
-        plt.rcParams.update({'font.size': 12})
-        plt.style.use(self.style_graph)
-        
-        # fitted
-        fitted = df_data_all[f"{self.folder}_fitted"]
-        fitted[fitted.index == date_predict_init] = df_data_all[df_data_all.index == date_predict_init][f"{self.folder}_predicted"]
-        plt.plot(fitted, color=self.color2)
-        
-        # forecast
-        plt.plot(df_data_all[f"{self.folder}_predicted"], color=self.color3)
-        
-        # plot original
-        observed = self.data_original.plot(
-            
-            title=f"FORECAST - {self.period.upper()} {self.folder.upper()}",
-            xlabel="",
-            ylabel="",
-            color=self.color1,
-            figsize=(12, 6)
-            
-        )
-        
-        # plot confidence interval
-        predict_conf_95 = fill_between(
-            
-            conf_95.index,
-            conf_95.iloc[ : , 0 ],
-            conf_95.iloc[ : , 1 ],
-            color=self.color4,
-            alpha=0.05
-            
-        )
-        
-        predict_conf_50 = fill_between(
-            
-            conf_50.index,
-            conf_50.iloc[ : , 0 ],
-            conf_50.iloc[ : , 1 ],
-            color=self.color4,
-            alpha=0.1
-            
-        )
-        
-        # plot legends
-        plt.legend(
-            
-            [
-                
-                f"fitted model (R² = {r2:.2f}%)",
-                f"forecast",
-                f"observed",
-                f"conf. int. 95%", 
-                f"conf. int. 50%"
-                
-            ],
+        spec = {
             
-            frameon = False
+            **self.style(),
+            'data_all': df_data_all,
+            'data_original': self.data_original,
+            'conf_95': conf_95,
+            'conf_50': conf_50,
+            'r2': r2,
+            'folder': self.folder,
+            'date_predict_init': date_predict_init,
+            'title': f"FORECAST - {self.period.upper()} {self.folder.upper()}",
+            'path': f"1_data/{self.folder}/{self.period}/results/{self.folder}_13_observed_fitted_predict_{self.period}.jpg"
             
-        )
-        
-        # config
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['bottom'].set_visible(False)
-        ax.spines['left'].set_visible(False)
+        }
         
-        plt.gcf().autofmt_xdate()
-        date_format = mpl_dates.DateFormatter('%b. %Y')
-        plt.gca().xaxis.set_major_formatter(date_format)
-        plt.xlabel("")
-        plt.ylabel(self.ylabel)
-        plt.tight_layout()
-        
-        # save fig
-        plt.savefig(f"1_data/{self.folder}/{self.period}/results/{self.folder}_13_observed_fitted_predict_{self.period}.jpg")
+        render_pool.submit(render_forecast_m, spec)
         
         return
 
@@ -423,11 +603,6 @@ class Model_execute:
         Observed x fitted + predict plot.
         """
         
-        # plot config
-        fig, ax = plt.subplots(1, 1, sharex=True, figsize=(12 , 6), dpi=300)
-        plt.rcParams.update({'font.size': 12})
-        plt.style.use(self.style_graph)
-        
         # *** fit model ***
         init_fitted = ( self.D_term * self.s_term ) + 1
         self.data_endog[f"{self.folder}_fitted"] = self.model_fit.predict(start=init_fitted, dynamic=False)
@@ -520,84 +695,20 @@ class Model_execute:
             
         )
         
-        # plot original
-        num_plot = int( ( len(self.data_original ) // 6) * -1)
-        self.data_original = self.data_original.iloc[ num_plot: ]
-        
-        observed = self.data_original.iloc[ num_plot: ].plot(
-            
-            title=f"FORECAST - {self.period.upper()} {self.folder.upper()}",
-            xlabel="",
-            ylabel="",
-            color=self.color1,
-            figsize=(12, 6)
-            
-        )
-        
-        # plot fitted
-        fitted = self.data_endog[self.data_endog.index >= self.data_original.index[0]]
-        fitted = self.data_endog.iloc[ num_plot: , 1 ]
-        fitted2 = df_data_all[df_data_all.index == date_predict_init]
-        fitted2 = concat([fitted, fitted2[f'{self.folder.lower()}_predicted']])
-        date_slice_plot = self.data_original.index[0]
-        fitted2 = fitted2[(fitted2.index >= date_slice_plot)]
-        
-        fitted2 = fitted2.plot(xlabel="", ylabel="", color=self.color2)
-        
-        # plot confidence interval
-        #predict_conf_95 = fill_between(
-        #    
-        #    conf_95.index,
-        #    conf_95.iloc[ : , 0 ],
-        #    conf_95.iloc[ : , 1 ],
-        #    color=self.color4,
-        #    alpha=0.05
-        #    
-        #)
-        #
-        #predict_conf_50 = fill_between(
-        #    
-        #    conf_50.index,
-        #    conf_50.iloc[ : , 0 ],
-        #    conf_50.iloc[ : , 1 ],
-        #    color=self.color4,
-        #    alpha=0.1
-        #    
-        #)
-        
-        # predicted plot
-        predicted = df_data_all[f"{self.folder.lower()}_predicted"].plot(color=self.color3)
-       
-        # plot legends
-        plt.legend(
+        spec = {
             
-            [
-                
-                f"observed",
-                f"fitted model (R² = {r2:.2f}%)",
-        #        f"conf. int. 95%", 
-        #        f"conf. int. 50%",
-                f"forecast"
-                
-            ],
+            **self.style(),
+            'data_all': df_data_all,
+            'data_endog': self.data_endog,
+            'data_original': self.data_original,
+            'r2': r2,
+            'folder': self.folder,
+            'date_predict_init': date_predict_init,
+            'title': f"FORECAST - {self.period.upper()} {self.folder.upper()}",
+            'path': f"1_data/{self.folder}/{self.period}/results/{self.folder}_13_observed_fitted_predict_{self.period}.jpg"
             
-            frameon = False
-            
-        )
+        }
         
-        # plot config
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['bottom'].set_visible(False)
-        ax.spines['left'].set_visible(False)
-        plt.gcf().autofmt_xdate()
-        date_format = mpl_dates.DateFormatter('%b. %Y')
-        plt.gca().xaxis.set_major_formatter(date_format)
-        plt.xlabel("")
-        plt.ylabel(self.ylabel)
-        plt.tight_layout()
-        
-        # save fig
-        plt.savefig(f"1_data/{self.folder}/{self.period}/results/{self.folder}_13_observed_fitted_predict_{self.period}.jpg")
+        render_pool.submit(render_forecast_d, spec)
         
         return
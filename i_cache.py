@@ -0,0 +1,293 @@
+from os import makedirs, listdir, remove, replace, utime, fdopen
+from os.path import exists, getmtime, getsize, dirname
+from tempfile import mkstemp
+from hashlib import sha256
+from pickle import dump, load, HIGHEST_PROTOCOL
+from json import load as json_load, dump as json_dump
+from time import time
+from numpy import ndarray, ascontiguousarray
+from pandas import DataFrame, Series
+from pandas.util import hash_pandas_object
+
+
+def fingerprint(*parts):
+    """
+    Hash of data (frames, series, arrays) and settings, used as cache key.
+    """
+
+    digest = sha256()
+
+    for part in parts:
+
+        if isinstance(part, (DataFrame, Series)):
+
+            if isinstance(part, DataFrame):
+                digest.update(repr(part.columns.to_list()).encode())
+
+            else:
+                digest.update(repr(part.name).encode())
+
+            digest.update(hash_pandas_object(part, index=True).values.tobytes())
+
+        elif isinstance(part, ndarray):
+
+            digest.update(repr((part.dtype.str, part.shape)).encode())
+            digest.update(ascontiguousarray(part).tobytes())
+
+        else:
+
+            digest.update(repr(part).encode())
+
+        digest.update(b'|')
+
+    return digest.hexdigest()
+
+
+class Disk_cache:
+    """
+    Key-value cache on disk (one pickle file per entry).
+
+    Required settings:
+    - path (cache folder)
+
+    Optional settings:
+    - ttl (seconds an entry is valid, None never expires)
+    - max_entries (entries kept, least recently used are evicted first)
+    - max_bytes (size of the folder, least recently used are evicted first)
+
+    """
+
+    def __init__(self, path, ttl = None, max_entries = None, max_bytes = None):
+        """
+        Settings for the outputs.
+        """
+
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        if not exists(self.path):
+            makedirs(self.path)
+
+
+    def _file(self, key):
+        """
+        File of an entry.
+        """
+
+        return f"{self.path}/{key}.pkl"
+
+
+    def get(self, key):
+        """
+        Value of an entry, None when it is missing or expired.
+        """
+
+        file_entry = self._file(key)
+
+        try:
+
+            with open(file_entry, 'rb') as entry:
+                entry = load(entry)
+
+        except (OSError, EOFError, ValueError):
+            return None
+
+        if self.ttl is not None and time() - entry['created'] > self.ttl:
+            self.delete(key)
+            return None
+
+        # last use (eviction order)
+        try:
+            utime(file_entry)
+
+        except OSError:
+            pass
+
+        return entry['value']
+
+
+    def set(self, key, value):
+        """
+        Save an entry (atomic replace) and evict the old ones.
+        """
+
+        descriptor, file_tmp = mkstemp(dir = self.path, suffix = '.tmp')
+
+        with fdopen(descriptor, 'wb') as entry:
+            dump({'created': time(), 'value': value}, entry, protocol=HIGHEST_PROTOCOL)
+
+        replace(file_tmp, self._file(key))
+
+        self.evict()
+
+        return
+
+
+    def delete(self, key):
+        """
+        Remove an entry.
+        """
+
+        try:
+            remove(self._file(key))
+
+        except OSError:
+            pass
+
+        return
+
+
+    def clear(self):
+        """
+        Remove every entry.
+        """
+
+        for file_name in listdir(self.path):
+
+            if file_name.endswith('.pkl'):
+                self.delete(file_name[ : -4 ])
+
+        return
+
+
+    def evict(self):
+        """
+        Remove the least recently used entries above max_entries/max_bytes.
+        """
+
+        if self.max_entries is None and self.max_bytes is None:
+            return
+
+        entries = []
+
+        for file_name in listdir(self.path):
+
+            if not file_name.endswith('.pkl'):
+                continue
+
+            try:
+                file_entry = f"{self.path}/{file_name}"
+                entries.append((getmtime(file_entry), getsize(file_entry), file_name[ : -4 ]))
+
+            except OSError:
+                pass
+
+        entries.sort()
+
+        n_entries = len(entries)
+        n_bytes = sum(entry[1] for entry in entries)
+
+        for _, size, key in entries:
+
+            over_entries = self.max_entries is not None and n_entries > self.max_entries
+            over_bytes = self.max_bytes is not None and n_bytes > self.max_bytes
+
+            if not over_entries and not over_bytes:
+                break
+
+            self.delete(key)
+
+            n_entries -= 1
+            n_bytes -= size
+
+        return
+
+
+
+class Artifact_manifest:
+    """
+    Hash of the data and settings that produced each output file (figures,
+    reports). An output whose hash matches the manifest and that is still
+    on disk is not rendered/written again.
+
+    Required settings:
+    - path (manifest json file)
+
+    """
+
+    def __init__(self, path):
+        """
+        Settings for the outputs.
+        """
+
+        self.path = path
+        self.hashes = None
+
+
+    def _load(self):
+        """
+        Read the manifest once (empty when missing or unreadable).
+        """
+
+        if self.hashes is None:
+
+            try:
+
+                with open(self.path) as manifest:
+                    self.hashes = json_load(manifest)
+
+            except (OSError, ValueError):
+                self.hashes = {}
+
+        return self.hashes
+
+
+    def fresh(self, path, key):
+        """
+        True when the file exists and was produced by the same hash.
+        """
+
+        return self._load().get(path) == key and exists(path)
+
+
+    def record(self, path, key):
+        """
+        Hash of a file just produced.
+        """
+
+        self._load()[path] = key
+
+        return
+
+
+    def write_text(self, path, text):
+        """
+        Write a text report, skipped when the content did not change.
+        """
+
+        key = fingerprint(text)
+
+        if self.fresh(path, key):
+            return
+
+        with open(path, 'w') as report:
+            report.write(text)
+
+        self.record(path, key)
+
+        return
+
+
+    def save(self):
+        """
+        Save the manifest (atomic replace).
+        """
+
+        if self.hashes is None:
+            return
+
+        folder = dirname(self.path) or '.'
+
+        if not exists(folder):
+            makedirs(folder)
+
+        descriptor, file_tmp = mkstemp(dir = folder, suffix = '.tmp')
+
+        with fdopen(descriptor, 'w') as manifest:
+            json_dump(self.hashes, manifest, indent = 2, sort_keys = True)
+
+        replace(file_tmp, self.path)
+
+        return
@@ -0,0 +1,142 @@
+from numpy import asarray, arange, float64, argsort, diff, polyfit, polyval
+from numpy.fft import rfft, rfftfreq
+from scipy.signal import welch, find_peaks
+from pandas import DataFrame
+
+
+class Spectral_analysis:
+    """
+    Spectral analysis of a time series: rfft periodogram and Welch estimate
+    of the detrended or differenced series, and the dominant periods
+    (candidate seasonal periods, in number of observations).
+
+    Required settings:
+    - data (series)
+
+    Optional settings:
+    - transform ("diff" first difference or "detrend" linear trend removed)
+
+    """
+
+    def __init__(self, data, transform = 'diff'):
+        """
+        Settings for the outputs.
+        """
+
+        values = asarray(data, dtype = float64)
+        values = values[values == values]
+
+        if transform == 'diff':
+            values = diff(values)
+
+        else:
+            time = arange(len(values))
+            values = values - polyval(polyfit(time, values, 1), time)
+
+        self.values = values - values.mean() if len(values) > 0 else values
+        self.transform = transform
+
+
+    def periodogram(self):
+        """
+        Periodogram (rfft), frequencies in cycles per observation (zero
+        frequency removed).
+        """
+
+        n = len(self.values)
+
+        power = abs(rfft(self.values)) ** 2 / n
+        frequency = rfftfreq(n, d = 1)
+
+        return frequency[1 : ], power[1 : ]
+
+
+    def welch(self, nperseg = None):
+        """
+        Welch estimate of the spectral density (averaged periodograms of
+        overlapping segments, less noisy than the raw periodogram).
+        """
+
+        n = len(self.values)
+
+        if nperseg is None:
+            nperseg = min(n, 256)
+
+        frequency, power = welch(self.values, fs = 1, nperseg = nperseg, detrend = 'linear')
+
+        return frequency[1 : ], power[1 : ]
+
+
+    def dominant_periods(self, n_peaks = 5, max_period = None):
+        """
+        Peaks of the periodogram ranked by power, with the period (1/frequency
+        rounded to observations), the share of the total power and the
+        Fisher g test p-value of each peak.
+        """
+
+        frequency, power = self.periodogram()
+
+        columns = ['period', 'frequency', 'power', 'power_share', 'p_value']
+
+        if len(power) < 3:
+            return DataFrame(columns = columns)
+
+        peaks, _ = find_peaks(power)
+
+        period = 1 / frequency[peaks]
+
+        # periods between 2 observations and max_period
+        keep = period >= 2
+
+        if max_period is not None:
+            keep = keep & (period <= max_period)
+
+        peaks = peaks[keep]
+
+        order = argsort(power[peaks])[ : : -1][ : n_peaks]
+        peaks = peaks[order]
+
+        total = power.sum()
+        n_freq = len(power)
+
+        share = power[peaks] / total
+
+        # Fisher g test (probability of a peak this large in white noise)
+        p_value = (n_freq * (1 - share) ** (n_freq - 1)).clip(max = 1)
+
+        data_periods = DataFrame(
+
+            {
+
+                'period': (1 / frequency[peaks]).round().astype(int),
+                'frequency': frequency[peaks],
+                'power': power[peaks],
+                'power_share': share,
+                'p_value': p_value
+
+            },
+
+            columns = columns
+
+        )
+
+        data_periods = data_periods.drop_duplicates('period').reset_index(drop = True)
+
+        return data_periods
+
+
+    def seasonal_period(self, p_value_accepted = 0.05, max_period = None):
+        """
+        Strongest significant period (candidate s of a SARIMA model), 1 when
+        no peak is significant (non-seasonal model).
+        """
+
+        data_periods = self.dominant_periods(max_period = max_period)
+
+        data_periods = data_periods[data_periods['p_value'] <= p_value_accepted]
+
+        if len(data_periods) == 0:
+            return 1
+
+        return int(data_periods['period'].iloc[0])
+
@@ -0,0 +1,231 @@
+from numpy import asarray, float64, zeros, ones, sqrt, log10, ceil, cumsum, arange
+from numpy import concatenate, newaxis
+from numpy.fft import rfft, irfft
+from scipy.stats import norm
+from pandas import DataFrame
+
+
+def acf_fft(values, nlags):
+    """
+    Autocorrelation (lags 0..nlags) through the FFT. values can be one
+    series or a 2-D array with one series per row (same length).
+    """
+
+    values = asarray(values, dtype = float64)
+    values = values - values.mean(axis = -1, keepdims = True)
+
+    n = values.shape[-1]
+
+    # zero padding (no circular overlap), power of 2 length
+    n_fft = 1 << (2 * n - 1).bit_length()
+
+    spectrum = rfft(values, n = n_fft, axis = -1)
+
+    acov = irfft(spectrum * spectrum.conj(), n = n_fft, axis = -1)[ ... , : nlags + 1] / n
+
+    return acov / acov[ ... , 0 : 1 ]
+
+
+def pacf_durbin_levinson(acf, nlags):
+    """
+    Partial autocorrelation (lags 0..nlags) from the autocorrelation with
+    the Durbin-Levinson recursion (Yule-Walker estimates). acf can be one
+    series or a 2-D array with one series per row.
+    """
+
+    acf = asarray(acf, dtype = float64)
+
+    single = acf.ndim == 1
+
+    if single:
+        acf = acf[newaxis, : ]
+
+    n_series = acf.shape[0]
+
+    pacf = zeros((n_series, nlags + 1))
+    pacf[ : , 0] = 1
+
+    phi = zeros((n_series, nlags + 1))
+    variance = ones(n_series)
+
+    for k in range(1, nlags + 1):
+
+        phi_prev = phi[ : , 1 : k ].copy()
+
+        numerator = acf[ : , k] - (phi_prev * acf[ : , k - 1 : 0 : -1]).sum(axis = 1)
+
+        phi_kk = numerator / variance
+
+        phi[ : , 1 : k ] = phi_prev - phi_kk[ : , newaxis] * phi_prev[ : , : : -1]
+        phi[ : , k] = phi_kk
+
+        variance = variance * (1 - phi_kk ** 2)
+
+        pacf[ : , k] = phi_kk
+
+    return pacf[0] if single else pacf
+
+
+def default_lags(nobs):
+    """
+    Default number of lags (statsmodels pacf plot rule, also valid for
+    the ACF).
+    """
+
+    return max(1, int(min(ceil(10 * log10(nobs)), nobs // 2 - 1)))
+
+
+class Correlation:
+    """
+    ACF (FFT) and PACF (Durbin-Levinson from the same ACF) of a series,
+    with confidence bands, computed once and shared by plots and exports.
+
+    Required settings:
+    - data (series)
+
+    Optional settings:
+    - nlags (number of lags, statsmodels plot default when None)
+    - alpha (confidence bands level, 0.05 -> 95%)
+
+    """
+
+    def __init__(self, data, nlags = None, alpha = 0.05):
+        """
+        Settings for the outputs.
+        """
+
+        values = asarray(data, dtype = float64).squeeze()
+        values = values[values == values]
+
+        self.nobs = len(values)
+        self.nlags = default_lags(self.nobs) if nlags is None else nlags
+        self.alpha = alpha
+
+        self.acf = acf_fft(values, self.nlags)
+        self.pacf = pacf_durbin_levinson(self.acf, self.nlags)
+
+        z = norm.ppf(1 - alpha / 2)
+
+        # Bartlett bands for the ACF, 1/sqrt(n) bands for the PACF
+        acf_var = concatenate(([0.0, 1.0], 1 + 2 * cumsum(self.acf[1 : -1] ** 2))) / self.nobs
+
+        self.acf_band = z * sqrt(acf_var)
+        self.pacf_band = concatenate(([0.0], z / sqrt(self.nobs) * ones(self.nlags)))
+
+
+    def results(self):
+        """
+        Lags, ACF, PACF and the half widths of their confidence bands.
+        """
+
+        return DataFrame(
+
+            {
+
+                'lag': arange(self.nlags + 1),
+                'acf': self.acf,
+                'acf_band': self.acf_band,
+                'pacf': self.pacf,
+                'pacf_band': self.pacf_band
+
+            }
+
+        )
+
+
+    def export(self, path):
+        """
+        Save the results (parquet when the path ends with .parquet, json
+        otherwise).
+        """
+
+        data_results = self.results()
+
+        if path.endswith('.parquet'):
+            data_results.to_parquet(path)
+
+        else:
+            data_results.to_json(path, orient = 'records', indent = 2)
+
+        return
+
+
+def plot_correlation(ax, values, band, title, color, zero = True, use_vlines = True):
+    """
+    Correlogram of precomputed values on a matplotlib axis (same look as
+    the statsmodels plot_acf/plot_pacf).
+    """
+
+    lags = arange(len(values))
+    first = 0 if zero else 1
+
+    if use_vlines:
+        ax.vlines(lags[first : ], [0], values[first : ], colors = color)
+        ax.axhline(color = color, linewidth = 1)
+
+    ax.plot(lags[first : ], values[first : ], marker = 'o', markersize = 5, linestyle = 'None', color = color)
+
+    ax.fill_between(
+
+        lags[first : ],
+        -band[first : ],
+        band[first : ],
+        alpha = 0.25,
+        linewidth = 0
+
+    )
+
+    ax.set_title(title)
+
+    return
+
+
+def render_correlogram(spec):
+    """
+    ACF and PACF figure (render process).
+    """
+
+    from matplotlib import pyplot as plt
+
+    fig, ax = plt.subplots(2, 1, sharex=False, figsize=(12, 6), dpi=300)
+
+    plot_correlation(
+
+        ax[0],
+        spec['acf'],
+        spec['acf_band'],
+        spec['title_acf'],
+        spec['color1'],
+        zero = spec['zero']
+
+    )
+
+    plot_correlation(
+
+        ax[1],
+        spec['pacf'],
+        spec['pacf_band'],
+        spec['title_pacf'],
+        spec['color2'],
+        zero = spec['zero']
+
+    )
+
+    ax[0].set_ylim(*spec['ylim'])
+    ax[1].set_ylim(*spec['ylim'])
+    ax[0].spines['top'].set_visible(False)
+    ax[0].spines['right'].set_visible(False)
+    ax[0].spines['bottom'].set_visible(False)
+    ax[0].spines['left'].set_visible(False)
+    ax[0].get_xaxis().set_ticks([])
+    ax[1].spines['top'].set_visible(False)
+    ax[1].spines['right'].set_visible(False)
+    ax[1].spines['bottom'].set_visible(False)
+    ax[1].spines['left'].set_visible(False)
+    plt.tight_layout()
+
+    # save
+    fig.savefig(spec['path'])
+    plt.close(fig)
+
+    return
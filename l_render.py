@@ -0,0 +1,158 @@
+from sys import modules
+from concurrent.futures import ProcessPoolExecutor
+from a_config import render_workers, headless, path_artifact_manifest
+from i_cache import Artifact_manifest, fingerprint
+
+
+def worker_init():
+    """
+    Non-interactive matplotlib backend for the render processes.
+    """
+
+    from matplotlib import use
+
+    use('Agg')
+
+    return
+
+
+def block_matplotlib():
+    """
+    Headless runs: importing matplotlib fails in this process, so libraries
+    that only plot optionally (e.g. pmdarima) skip it.
+    """
+
+    for name in ['matplotlib', 'matplotlib.pyplot']:
+
+        if modules.get(name) is None:
+            modules[name] = None
+
+    return
+
+
+def matplotlib_loaded():
+    """
+    True when a matplotlib module was imported in this process.
+    """
+
+    return any(
+
+        module is not None and name.split('.')[0] == 'matplotlib'
+        for name, module in list(modules.items())
+
+    )
+
+
+class Render_pool:
+    """
+    Figures rendered off the modelling process. The stages prepare the plot
+    data (spec dict) and submit a module-level render function, the pool
+    rasterizes while the pipeline moves on to the next ticker/period.
+    A figure whose spec hash matches the manifest is not rendered again.
+
+    Optional settings:
+    - workers (render processes, 0 renders in the calling process)
+    - headless (True drops every figure, matplotlib is never imported)
+    - manifest (Artifact_manifest of the outputs)
+
+    """
+
+    def __init__(self, workers = render_workers, headless = headless, manifest = None):
+        """
+        Settings for the outputs.
+        """
+
+        self.workers = workers
+        self.headless = headless
+        self.manifest = manifest
+        self.executor = None
+        self.futures = []
+
+
+    def submit(self, render, spec):
+        """
+        Render a figure: render(spec) runs in a worker process.
+        """
+
+        if self.headless:
+            return
+
+        path = spec['path']
+
+        # render function and every spec entry (data, style, path)
+        key = fingerprint(
+
+            f"{render.__module__}.{render.__qualname__}",
+            *[part for name in sorted(spec) for part in (name, spec[name])]
+
+        )
+
+        if self.manifest is not None and self.manifest.fresh(path, key):
+            return
+
+        if self.workers <= 0:
+
+            worker_init()
+            render(spec)
+
+            self.record(path, key)
+
+            return
+
+        if self.executor is None:
+
+            self.executor = ProcessPoolExecutor(
+
+                max_workers = self.workers,
+                initializer = worker_init
+
+            )
+
+        self.futures.append((self.executor.submit(render, spec), path, key))
+
+        return
+
+
+    def record(self, path, key):
+        """
+        Hash of a rendered figure.
+        """
+
+        if self.manifest is not None:
+            self.manifest.record(path, key)
+
+        return
+
+
+    def wait(self):
+        """
+        Wait for the outstanding figures. Returns the errors of the failed
+        ones.
+        """
+
+        errors = []
+
+        for future, path, key in self.futures:
+
+            try:
+                future.result()
+                self.record(path, key)
+
+            except Exception as erro:
+                errors.append(erro)
+
+        self.futures = []
+
+        if self.manifest is not None:
+            self.manifest.save()
+
+        if self.executor is not None:
+            self.executor.shutdown(wait = True)
+            self.executor = None
+
+        return errors
+
+
+# outputs manifest and pool shared by all the stages
+artifact_manifest = Artifact_manifest(path_artifact_manifest)
+render_pool = Render_pool(manifest = artifact_manifest)
@@ -0,0 +1,464 @@
+from json import load, dump
+from os import makedirs, replace, fdopen
+from os.path import exists, dirname
+from tempfile import mkstemp
+from numpy import asarray, float64, concatenate, argsort, cumsum, searchsorted, quantile
+from numpy import sqrt, inf, nan
+from pandas import Timestamp
+from i_cache import fingerprint
+
+
+# saved fields of Online_stats (besides the sketch)
+state_fields = [
+
+    'n', 'mean', 'm2', 'm3', 'm4', 'lowest', 'highest',
+    'first_index', 'last_index', 'rows', 'overlap'
+
+]
+
+
+class Quantile_sketch:
+    """
+    Mergeable quantile sketch (KLL style compactors). Level i keeps items
+    of weight 2 ** i; a full level is sorted and every other item moves up
+    one level, so the memory is O(k log(n / k)) and two sketches merge by
+    joining their levels. Exact while the data fits in the first level.
+
+    Optional settings:
+    - k (items per level, larger is more accurate)
+
+    """
+
+    def __init__(self, k = 200):
+        """
+        Settings for the outputs.
+        """
+
+        self.k = k
+        self.levels = [asarray([], dtype = float64)]
+        self.parity = [0]
+
+
+    def update(self, values):
+        """
+        Add a batch of values.
+        """
+
+        self.levels[0] = concatenate((self.levels[0], asarray(values, dtype = float64)))
+
+        self.compact()
+
+        return self
+
+
+    def merge(self, other):
+        """
+        Join another sketch (same k) into this one.
+        """
+
+        for level, items in enumerate(other.levels):
+
+            if level >= len(self.levels):
+                self.levels.append(asarray([], dtype = float64))
+                self.parity.append(0)
+
+            self.levels[level] = concatenate((self.levels[level], items))
+
+        self.compact()
+
+        return self
+
+
+    def compact(self):
+        """
+        Halve the full levels (the odd item, if any, stays in its level).
+        """
+
+        level = 0
+
+        while level < len(self.levels):
+
+            items = self.levels[level]
+
+            if len(items) > self.k:
+
+                items = items[argsort(items, kind = 'stable')]
+
+                keep = items[-1 : ] if len(items) % 2 else items[ : 0 ]
+                items = items[ : len(items) - len(keep)]
+
+                # alternate the offset (unbiased ranks)
+                promoted = items[self.parity[level] : : 2]
+                self.parity[level] = 1 - self.parity[level]
+
+                if level + 1 == len(self.levels):
+                    self.levels.append(asarray([], dtype = float64))
+                    self.parity.append(0)
+
+                self.levels[level] = keep
+                self.levels[level + 1] = concatenate((self.levels[level + 1], promoted))
+
+            level += 1
+
+        return
+
+
+    def quantile(self, q):
+        """
+        Value at quantile q (0..1).
+        """
+
+        if len(self.levels) == 1:
+
+            if len(self.levels[0]) == 0:
+                return nan
+
+            return float(quantile(self.levels[0], q))
+
+        items = concatenate(self.levels)
+
+        weights = concatenate([
+
+            [2.0 ** level] * len(level_items)
+
+            for level, level_items in enumerate(self.levels)
+
+        ])
+
+        order = argsort(items, kind = 'stable')
+        rank = cumsum(weights[order])
+
+        position = min(searchsorted(rank, q * rank[-1]), len(items) - 1)
+
+        return float(items[order][position])
+
+
+    def exact(self):
+        """
+        True while no level was compacted (quantiles are exact).
+        """
+
+        return len(self.levels) == 1
+
+
+    def state(self):
+        """
+        Serializable state.
+        """
+
+        return {
+
+            'k': self.k,
+            'levels': [items.tolist() for items in self.levels],
+            'parity': list(self.parity)
+
+        }
+
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Sketch from a saved state.
+        """
+
+        sketch = cls(state['k'])
+
+        sketch.levels = [asarray(items, dtype = float64) for items in state['levels']]
+        sketch.parity = list(state['parity'])
+
+        return sketch
+
+
+class Online_stats:
+    """
+    One pass descriptive statistics: count, mean, variance, skewness and
+    kurtosis (Welford/Pebay central moments), min, max and quantiles
+    (Quantile_sketch). A batch of new bars updates the state in O(new
+    rows) and two states (e.g. partitions or tickers) merge exactly.
+
+    Optional settings:
+    - k (quantile sketch items per level)
+
+    """
+
+    def __init__(self, k = 200):
+        """
+        Settings for the outputs.
+        """
+
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.lowest = inf
+        self.highest = -inf
+        self.sketch = Quantile_sketch(k)
+
+        # window covered by the state (incremental updates)
+        self.first_index = None
+        self.last_index = None
+        self.rows = 0
+        self.overlap = None
+
+
+    def combine(self, n_b, mean_b, m2_b, m3_b, m4_b):
+        """
+        Join the central moments of another block (Pebay formulas).
+        """
+
+        n_a = self.n
+        n = n_a + n_b
+
+        if n_b == 0:
+            return
+
+        if n_a == 0:
+
+            self.n, self.mean, self.m2, self.m3, self.m4 = n_b, mean_b, m2_b, m3_b, m4_b
+
+            return
+
+        delta = mean_b - self.mean
+
+        m4 = (
+
+            self.m4 + m4_b +
+            delta ** 4 * n_a * n_b * (n_a ** 2 - n_a * n_b + n_b ** 2) / n ** 3 +
+            6 * delta ** 2 * (n_a ** 2 * m2_b + n_b ** 2 * self.m2) / n ** 2 +
+            4 * delta * (n_a * m3_b - n_b * self.m3) / n
+
+        )
+
+        m3 = (
+
+            self.m3 + m3_b +
+            delta ** 3 * n_a * n_b * (n_a - n_b) / n ** 2 +
+            3 * delta * (n_a * m2_b - n_b * self.m2) / n
+
+        )
+
+        m2 = self.m2 + m2_b + delta ** 2 * n_a * n_b / n
+
+        self.n = n
+        self.mean = self.mean + delta * n_b / n
+        self.m2, self.m3, self.m4 = m2, m3, m4
+
+        return
+
+
+    def update(self, values):
+        """
+        Add a batch of values (NaN are ignored).
+        """
+
+        values = asarray(values, dtype = float64).ravel()
+        values = values[values == values]
+
+        if len(values) == 0:
+            return self
+
+        mean_b = values.mean()
+        centered = values - mean_b
+        centered_2 = centered * centered
+
+        self.combine(
+
+            len(values),
+            mean_b,
+            centered_2.sum(),
+            (centered_2 * centered).sum(),
+            (centered_2 * centered_2).sum()
+
+        )
+
+        self.lowest = min(self.lowest, float(values.min()))
+        self.highest = max(self.highest, float(values.max()))
+        self.sketch.update(values)
+
+        return self
+
+
+    def update_series(self, data, overlap = 5):
+        """
+        Bring the state up to date with a series: only the bars after the
+        last one seen are added, in O(new rows + overlap). The state is
+        rebuilt when the window start or the number of rows seen changed,
+        or when one of the last `overlap` bars seen was revised (the bars
+        the price store refresh rewrites).
+        """
+
+        if len(data) == 0:
+            return self
+
+        rows_seen = 0
+
+        if self.last_index is not None:
+
+            rows_seen = searchsorted(data.index, Timestamp(self.last_index), side = 'right')
+
+            valid = (
+
+                Timestamp(self.first_index) == data.index[0] and
+                rows_seen == self.rows and
+                fingerprint(data.iloc[max(0, rows_seen - overlap) : rows_seen].astype(float64)) == self.overlap
+
+            )
+
+            if not valid:
+                self.__init__(self.sketch.k)
+                rows_seen = 0
+
+        if self.first_index is None:
+            self.first_index = str(data.index[0])
+
+        self.update(data.values[rows_seen : ])
+
+        self.last_index = str(data.index[-1])
+        self.rows = len(data)
+        self.overlap = fingerprint(data.iloc[max(0, len(data) - overlap) : ].astype(float64))
+
+        return self
+
+
+    def merge(self, other):
+        """
+        Join another state (e.g. another partition or ticker).
+        """
+
+        self.combine(other.n, other.mean, other.m2, other.m3, other.m4)
+
+        self.lowest = min(self.lowest, other.lowest)
+        self.highest = max(self.highest, other.highest)
+        self.sketch.merge(other.sketch)
+
+        self.first_index = self.last_index = self.overlap = None
+        self.rows = 0
+
+        return self
+
+
+    def variance(self, ddof = 0):
+        """
+        Variance (ddof = 0 population, 1 sample).
+        """
+
+        return self.m2 / (self.n - ddof) if self.n > ddof else nan
+
+
+    def std(self, ddof = 0):
+        """
+        Standard deviation.
+        """
+
+        return sqrt(self.variance(ddof))
+
+
+    def skewness(self):
+        """
+        Skewness (biased, as scipy.stats.skew).
+        """
+
+        return sqrt(self.n) * self.m3 / self.m2 ** 1.5 if self.m2 > 0 else nan
+
+
+    def kurtosis(self):
+        """
+        Excess kurtosis (biased, as scipy.stats.kurtosis).
+        """
+
+        return self.n * self.m4 / self.m2 ** 2 - 3 if self.m2 > 0 else nan
+
+
+    def quantile(self, q):
+        """
+        Value at quantile q (0..1).
+        """
+
+        return self.sketch.quantile(q)
+
+
+    def results(self, quantiles = (0.05, 0.25, 0.5, 0.75, 0.95)):
+        """
+        Statistics as a dict.
+        """
+
+        return {
+
+            'count': self.n,
+            'mean': float(self.mean),
+            'median': self.quantile(0.5),
+            'std': float(self.std()),
+            'variance': float(self.variance()),
+            'skewness': float(self.skewness()),
+            'kurtosis': float(self.kurtosis()),
+            'lowest': float(self.lowest),
+            'highest': float(self.highest),
+            'quantiles': {str(q): self.quantile(q) for q in quantiles},
+            'quantiles_exact': self.sketch.exact()
+
+        }
+
+
+    def save(self, path):
+        """
+        Save the state (json, atomic replace).
+        """
+
+        folder = dirname(path) or '.'
+
+        if not exists(folder):
+            makedirs(folder)
+
+        state = {
+
+            'n': self.n,
+            'mean': self.mean,
+            'm2': self.m2,
+            'm3': self.m3,
+            'm4': self.m4,
+            'lowest': self.lowest,
+            'highest': self.highest,
+            'first_index': self.first_index,
+            'last_index': self.last_index,
+            'rows': self.rows,
+            'overlap': self.overlap,
+            'sketch': self.sketch.state()
+
+        }
+
+        descriptor, file_tmp = mkstemp(dir = folder, suffix = '.tmp')
+
+        with fdopen(descriptor, 'w') as file_state:
+            dump(state, file_state)
+
+        replace(file_tmp, path)
+
+        return
+
+
+    @classmethod
+    def load(cls, path, k = 200):
+        """
+        State saved in path, a new one when it is missing, unreadable or
+        from an older layout.
+        """
+
+        stats = cls(k)
+
+        try:
+
+            with open(path) as file_state:
+                state = load(file_state)
+
+            values = [state[name] for name in state_fields]
+
+        except (OSError, ValueError, KeyError):
+            return stats
+
+        for name, value in zip(state_fields, values):
+            setattr(stats, name, value)
+
+        stats.sketch = Quantile_sketch.from_state(state['sketch'])
+
+        return stats
@@ -0,0 +1,164 @@
+from numpy import asarray, float64, arange, full, nan, ones, isfinite, exp, log, where
+from numpy import convolve, newaxis
+from scipy.ndimage import correlate1d
+from pandas import Series
+
+
+# periods by frequency (observations per year)
+seasonal_periods = {'MS': 12, 'M': 12, 'QS': 4, 'Q': 4}
+
+
+def henderson_weights(n_terms):
+    """
+    Henderson moving average weights (odd number of terms).
+    """
+
+    p = (n_terms - 1) // 2
+    m = p + 2
+    j = arange(-p, p + 1, dtype = float64)
+
+    weights = (
+
+        315 * ((m - 1) ** 2 - j ** 2) * (m ** 2 - j ** 2) * ((m + 1) ** 2 - j ** 2) *
+        (3 * m ** 2 - 16 - 11 * j ** 2) /
+        (8 * m * (m ** 2 - 1) * (4 * m ** 2 - 1) * (4 * m ** 2 - 9) * (4 * m ** 2 - 25))
+
+    )
+
+    return weights
+
+
+def composite_weights(first, second):
+    """
+    Weights of a first x second moving average (e.g. 2x12, 3x3, 3x5).
+    """
+
+    return convolve(ones(first) / first, ones(second) / second)
+
+
+def masked_filter(values, weights, axis = -1):
+    """
+    Centered moving average along an axis of a panel with missing values
+    (NaN). The weights available at each point (series ends, gaps) are
+    renormalized, so the ends get truncated (asymmetric) filters.
+    """
+
+    mask = isfinite(values).astype(float64)
+
+    numerator = correlate1d(where(mask > 0, values, 0.0), weights, axis = axis, mode = 'constant')
+    denominator = correlate1d(mask, weights, axis = axis, mode = 'constant')
+
+    with_data = (mask > 0) & (abs(denominator) > 1e-12)
+
+    return where(with_data, numerator / where(with_data, denominator, 1.0), nan)
+
+
+def seasonal_filter(values, period, weights):
+    """
+    Moving average of each month (quarter) across the years: the panel
+    (series x time) is folded to (series x years x period) and filtered
+    along the years.
+    """
+
+    n_series, n_obs = values.shape
+    n_years = -(-n_obs // period)
+
+    folded = full((n_series, n_years * period), nan)
+    folded[ : , : n_obs] = values
+    folded = folded.reshape(n_series, n_years, period)
+
+    filtered = masked_filter(folded, weights, axis = 1)
+
+    return filtered.reshape(n_series, n_years * period)[ : , : n_obs]
+
+
+def x11_panel(values, period = 12, mode = 'auto', henderson = 13):
+    """
+    X-11 style decomposition of a panel (series x time, NaN outside each
+    series window) in one batched pass:
+
+    1. trend: centered 2 x period moving average
+    2. seasonal: 3x3 moving average of each month of the SI ratios,
+       centered on zero (2 x period moving average removed)
+    3. trend: Henderson moving average of the adjusted series
+    4. seasonal: 3x5 moving average of the new SI ratios, centered
+    5. final trend (Henderson) and irregular of the adjusted series
+
+    mode "multiplicative" works on logs (components are factors around 1),
+    "additive" on levels, "auto" is multiplicative for positive series.
+    Returns the adjusted series, trend, seasonal and irregular panels.
+    """
+
+    values = asarray(values, dtype = float64)
+
+    if values.ndim == 1:
+        values = values[newaxis, : ]
+
+    # multiplicative series (one flag per row)
+    if mode == 'auto':
+        multiplicative = ((values > 0) | ~isfinite(values)).all(axis = 1)
+
+    else:
+        multiplicative = full(values.shape[0], mode == 'multiplicative')
+
+    positive = where(values > 0, values, nan)
+    data = where(multiplicative[ : , newaxis], log(where(multiplicative[ : , newaxis], positive, 1.0)), values)
+
+    weights_trend = composite_weights(2, period) if period % 2 == 0 else ones(period) / period
+    weights_henderson = henderson_weights(henderson)
+
+    def seasonal_component(si, first, second):
+
+        seasonal = seasonal_filter(si, period, composite_weights(first, second))
+
+        # seasonal factors sum to zero over a year
+        return seasonal - masked_filter(seasonal, weights_trend)
+
+    # stage 1
+    trend = masked_filter(data, weights_trend)
+    seasonal = seasonal_component(data - trend, 3, 3)
+
+    # stage 2
+    trend = masked_filter(data - seasonal, weights_henderson)
+    seasonal = seasonal_component(data - trend, 3, 5)
+
+    # final components
+    seasadj = data - seasonal
+    trend = masked_filter(seasadj, weights_henderson)
+    irregular = seasadj - trend
+
+    components = []
+
+    for component in (seasadj, trend, seasonal, irregular):
+        components.append(where(multiplicative[ : , newaxis], exp(component), component))
+
+    return components
+
+
+def native_run(data, period = 12, mode = 'auto'):
+    """
+    Native seasonal adjustment of every column of a frame (one batched
+    pass). Same outputs as the X-13 run of each column: seasonally adjusted,
+    trend and irregular series and the settings used (spec).
+    """
+
+    seasadj, trend, seasonal, irregular = x11_panel(data.values.T, period, mode)
+
+    spec = f"native x11: period {period}, mode {mode}, seasonal 3x3/3x5, henderson 13"
+
+    results = {}
+
+    for position, col in enumerate(data.columns):
+
+        valid = data[col].notna().values
+
+        results[col] = {
+
+            'seasadj': Series(seasadj[position][valid], index = data.index[valid], name = col),
+            'trend': Series(trend[position][valid], index = data.index[valid], name = col),
+            'irregular': Series(irregular[position][valid], index = data.index[valid], name = col),
+            'spec': spec
+
+        }
+
+    return results
@@ -0,0 +1,333 @@
+from numpy import asarray, float64, ones, arange, zeros, full, ceil, log, sqrt, diff, where, nan
+from numpy import concatenate, einsum, interp, unique, newaxis
+from numpy.linalg import solve, pinv
+from numpy.lib.stride_tricks import sliding_window_view
+from statsmodels.tsa.adfvalues import mackinnonp
+from pandas import DataFrame
+
+
+# KPSS critical values (Kwiatkowski et al. 1992, table 1)
+kpss_crit = {
+
+    'c': [0.347, 0.463, 0.574, 0.739],
+    'ct': [0.119, 0.146, 0.176, 0.216]
+
+}
+
+kpss_p_values = [0.10, 0.05, 0.025, 0.01]
+
+
+def default_maxlag(nobs, regression = 'ct'):
+    """
+    ADF maximum lag (statsmodels adfuller rule, 12 * (nobs / 100) ** 1/4).
+    """
+
+    ntrend = len(regression) if regression != 'n' else 0
+
+    maxlag = int(ceil(12 * (nobs / 100) ** (1 / 4)))
+
+    return max(0, min(nobs // 2 - ntrend - 1, maxlag))
+
+
+def adf_design(values, lag, regression, n_obs = None):
+    """
+    ADF regression of a panel (series x time) with `lag` lagged differences:
+    target dy_t and design [y_t-1, dy_t-1 .. dy_t-lag, const, trend], built
+    with sliding windows over the differences. n_obs keeps the last n_obs
+    rows (common sample of the lag search).
+    """
+
+    dy = diff(values, axis = 1)
+
+    # windows [dy_t-lag .. dy_t], one per regression row
+    windows = sliding_window_view(dy, lag + 1, axis = 1)
+
+    target = windows[ ... , -1]
+    lagged = windows[ ... , -2 : : -1] if lag > 0 else windows[ ... , : 0]
+
+    y_lag = values[ : , lag : -1][ ... , newaxis]
+
+    n_rows = target.shape[1]
+
+    deterministic = []
+
+    if regression in ('c', 'ct', 'ctt'):
+        deterministic.append(ones(n_rows))
+
+    if regression in ('ct', 'ctt'):
+        deterministic.append(arange(1, n_rows + 1, dtype = float64))
+
+    if regression == 'ctt':
+        deterministic.append(arange(1, n_rows + 1, dtype = float64) ** 2)
+
+    columns = [y_lag, lagged]
+
+    if deterministic:
+
+        trend = asarray(deterministic).T[newaxis, : , : ]
+        columns.append(trend.repeat(values.shape[0], axis = 0))
+
+    design = concatenate(columns, axis = 2)
+
+    if n_obs is not None:
+
+        target = target[ : , -n_obs : ]
+        design = design[ : , -n_obs : , : ]
+
+    return target, design
+
+
+def batch_ols(target, design):
+    """
+    OLS of every series at once (normal equations, batched pseudo-inverse,
+    so a constant series does not stop the batch). Returns the coefficients,
+    their covariance and the sum of squared residuals.
+    """
+
+    xtx_inv = pinv(einsum('smk,sml->skl', design, design))
+    xty = einsum('smk,sm->sk', design, target)
+
+    params = einsum('skl,sl->sk', xtx_inv, xty)
+
+    resid = target - einsum('smk,sk->sm', design, params)
+    ssr = (resid ** 2).sum(axis = 1)
+
+    n_rows, n_params = design.shape[1], design.shape[2]
+
+    sigma2 = ssr / (n_rows - n_params)
+    cov = xtx_inv * sigma2[ : , newaxis, newaxis]
+
+    return params, cov, ssr
+
+
+def adf_batch(values, regression = 'ct', lags = None, maxlag = None):
+    """
+    ADF test of a panel of equal length series (series x time) in batched
+    regressions.
+
+    lags None searches the lag of each series by AIC on the common sample
+    (as statsmodels adfuller autolag="AIC"), an int or an array (one lag
+    per series) fixes it. Returns the statistics, MacKinnon p-values, lags
+    and number of observations of every series.
+    """
+
+    values = asarray(values, dtype = float64)
+
+    if values.ndim == 1:
+        values = values[newaxis, : ]
+
+    n_series, n_time = values.shape
+
+    if maxlag is None:
+        maxlag = default_maxlag(n_time, regression)
+
+    if lags is None:
+
+        # lag search: every lag on the last n_time - 1 - maxlag rows
+        n_common = n_time - 1 - maxlag
+
+        best_aic = full(n_series, float('inf'))
+        lags = zeros(n_series, dtype = int)
+
+        for lag in range(maxlag + 1):
+
+            target, design = adf_design(values, lag, regression, n_common)
+
+            _, _, ssr = batch_ols(target, design)
+
+            aic = n_common * log(ssr / n_common) + 2 * design.shape[2]
+
+            better = aic < best_aic
+            best_aic = where(better, aic, best_aic)
+            lags = where(better, lag, lags)
+
+    lags = asarray(lags, dtype = int) * ones(n_series, dtype = int)
+
+    statistics = zeros(n_series)
+    n_obs = zeros(n_series, dtype = int)
+
+    # final regression of each lag group (full sample of that lag)
+    for lag in unique(lags):
+
+        rows = lags == lag
+
+        target, design = adf_design(values[rows], int(lag), regression)
+
+        params, cov, _ = batch_ols(target, design)
+
+        statistics[rows] = params[ : , 0] / sqrt(cov[ : , 0, 0])
+        n_obs[rows] = target.shape[1]
+
+    p_values = asarray([mackinnonp(statistic, regression = regression, N = 1) for statistic in statistics])
+
+    return {
+
+        'statistic': statistics,
+        'p_value': p_values,
+        'lags': lags,
+        'nobs': n_obs
+
+    }
+
+
+def kpss_batch(values, regression = 'c', nlags = None):
+    """
+    KPSS test of a panel of equal length series (series x time): residuals
+    of the level (or level and trend) regression of every series at once,
+    Bartlett long-run variance with nlags (statsmodels "legacy" rule when
+    None). p-values are interpolated in the KPSS table (0.01 to 0.10).
+    """
+
+    values = asarray(values, dtype = float64)
+
+    if values.ndim == 1:
+        values = values[newaxis, : ]
+
+    n_series, n_time = values.shape
+
+    if regression == 'ct':
+
+        # same design for every series: one solve, one column per series
+        time = arange(n_time, dtype = float64)
+        design = concatenate((ones((n_time, 1)), time[ : , newaxis]), axis = 1)
+
+        params = solve(design.T @ design, design.T @ values.T)
+
+        resid = values - (design @ params).T
+
+    else:
+        resid = values - values.mean(axis = 1, keepdims = True)
+
+    if nlags is None:
+        nlags = min(int(ceil(12 * (n_time / 100) ** (1 / 4))), n_time - 1)
+
+    # long-run variance (Bartlett kernel)
+    long_run = (resid ** 2).sum(axis = 1)
+
+    for lag in range(1, nlags + 1):
+        long_run = long_run + 2 * (1 - lag / (nlags + 1)) * (resid[ : , lag : ] * resid[ : , : -lag ]).sum(axis = 1)
+
+    long_run = long_run / n_time
+
+    eta = (resid.cumsum(axis = 1) ** 2).sum(axis = 1) / (n_time ** 2)
+
+    statistics = eta / long_run
+
+    p_values = interp(statistics, kpss_crit[regression], kpss_p_values)
+
+    return {
+
+        'statistic': statistics,
+        'p_value': p_values,
+        'lags': full(n_series, nlags)
+
+    }
+
+
+class Integration_order:
+    """
+    Order of integration of many equal length series at once: every round
+    runs one batched ADF over the series still non-stationary and
+    differences them, until the ADF p-value is below p_value_accepted or
+    max_diff is reached. KPSS of the final series is reported as a
+    cross-check. Missing values are tested as 0 and become 0 once a series
+    is differenced (as diff().fillna(0)).
+
+    Required settings:
+    - data (frame, one series per column, equal length)
+
+    Optional settings:
+    - p_value_accepted (ADF p-value accepted)
+    - regression (ADF deterministic terms: "c" or "ct")
+    - lag_mode ("auto" AIC lag search every round, "fixed" lag searched on
+      the level and reused on the differences)
+    - max_diff (maximum differencing order)
+
+    """
+
+    def __init__(self, data, p_value_accepted = 0.05, regression = 'ct', lag_mode = 'auto', max_diff = 5):
+        """
+        Settings for the outputs.
+        """
+
+        self.columns = data.columns
+        self.index = data.index
+
+        values = asarray(data.values, dtype = float64).T.copy()
+
+        n_series = values.shape[0]
+
+        order = zeros(n_series, dtype = int)
+        statistic = zeros(n_series)
+        p_value = ones(n_series)
+        lags = zeros(n_series, dtype = int)
+        nobs = zeros(n_series, dtype = int)
+
+        level_lags = None
+        active = arange(n_series)
+
+        for round_diff in range(max_diff + 1):
+
+            round_lags = None if lag_mode == 'auto' or level_lags is None else level_lags[active]
+
+            values_test = values[active]
+
+            results = adf_batch(where(values_test == values_test, values_test, 0.0), regression, round_lags)
+
+            if level_lags is None:
+                level_lags = results['lags']
+
+            statistic[active] = results['statistic']
+            p_value[active] = results['p_value']
+            lags[active] = results['lags']
+            nobs[active] = results['nobs']
+
+            non_stationary = results['p_value'] > p_value_accepted
+
+            if round_diff == max_diff or not non_stationary.any():
+                break
+
+            # difference the non-stationary series (same length)
+            active = active[non_stationary]
+
+            values_diff = concatenate((full((len(active), 1), nan), diff(values[active], axis = 1)), axis = 1)
+
+            values[active] = where(values_diff == values_diff, values_diff, 0.0)
+            order[active] += 1
+
+        kpss = kpss_batch(where(values == values, values, 0.0), 'ct' if regression == 'ct' else 'c')
+
+        self.values = values
+
+        self.data_results = DataFrame(
+
+            {
+
+                'variable': list(self.columns),
+                'order': order,
+                'adf_statistic': statistic,
+                'adf_p_value': p_value,
+                'adf_lags': lags,
+                'adf_nobs': nobs,
+                'kpss_statistic': kpss['statistic'],
+                'kpss_p_value': kpss['p_value']
+
+            }
+
+        )
+
+
+    def results(self):
+        """
+        Differencing order and final ADF/KPSS results of every series.
+        """
+
+        return self.data_results
+
+
+    def stationary(self):
+        """
+        Series differenced to their order (frame as the input).
+        """
+
+        return DataFrame(self.values.T, index = self.index, columns = self.columns)
@@ -3,345 +3,428 @@ from shutil import rmtree
 from os import mkdir
 from os.path import exists
 from pandas import concat, read_csv, to_datetime, DataFrame
-from a_config import tickers_dict, path_x13_arima
-from b_data_input import Data_input
-from c_pred_indep_var import Arima_indep
+from a_config import tickers_dict, path_x13_arima, use_price_matrix, headless
+from b_data_input import Data_input, Price_store, Price_matrix, universe_ranges
+from c_pred_indep_var import Arima_indep, Var_indep, artifact_wait
 from d_descriptive_statistics import Time_serie_level
 from e_x13arima_seas_adjust import X13_arima_desaz
 from f_stationarity import Stationarity_diff
 from g_dummy import Dummy_generator
 from h_model_execute import Model_execute
+from l_render import render_pool, block_matplotlib, matplotlib_loaded
 
 
 # suppress warnings - sorry about that =(
 filterwarnings("ignore")
 
-for folder in tickers_dict.keys(): 
+
+def main():
+    """
+    Pipeline for every ticker/period of tickers_dict.
+    """
     
-    # folders
-    if not exists("1_data"):
-        mkdir("1_data")
+    # numbers only run: matplotlib stays out of the process
+    if headless:
+        block_matplotlib()
     
-    if not exists(f"1_data/{folder}"):
-        mkdir(f"1_data/{folder}")    
+    # ingestion (price history of the whole universe, downloaded concurrently)
+    price_store = Price_store()
+    universe = universe_ranges(tickers_dict)
 
-    for period in tickers_dict[folder].keys():
-        
-        # variables
-        ticker = tickers_dict[folder][period]['ticker']
-        date_train_init = tickers_dict[folder][period]['date_train_init']
-        date_train_end = tickers_dict[folder][period]['date_train_end']
-        date_predict_init = tickers_dict[folder][period]['date_predict_init']
-        date_predict_end = tickers_dict[folder][period]['date_predict_end']
-        
+    ingest_errors = price_store.prefetch(universe)
+
+    for ticker_error, erro in ingest_errors.items():
+        print(ticker_error, erro)
+
+    if use_price_matrix:
+        Price_matrix().build(price_store, universe)
+
+    for folder in tickers_dict.keys(): 
+    
         # folders
-        if not exists(f"1_data/{folder}/{period}"):
-            mkdir(f"1_data/{folder}/{period}")
+        if not exists("1_data"):
+            mkdir("1_data")
+    
+        if not exists(f"1_data/{folder}"):
+            mkdir(f"1_data/{folder}")    
+
+        for period in tickers_dict[folder].keys():
         
-        if exists(f"1_data/{folder}/{period}/data_base"):
-            rmtree(f"1_data/{folder}/{period}/data_base")
-            mkdir(f"1_data/{folder}/{period}/data_base")
+            # variables
+            ticker = tickers_dict[folder][period]['ticker']
+            date_train_init = tickers_dict[folder][period]['date_train_init']
+            date_train_end = tickers_dict[folder][period]['date_train_end']
+            date_predict_init = tickers_dict[folder][period]['date_predict_init']
+            date_predict_end = tickers_dict[folder][period]['date_predict_end']
         
-        else:
-            mkdir(f"1_data/{folder}/{period}/data_base")
+            # folders
+            if not exists(f"1_data/{folder}/{period}"):
+                mkdir(f"1_data/{folder}/{period}")
         
-        if exists(f"1_data/{folder}/{period}/results"):
-            rmtree(f"1_data/{folder}/{period}/results")
-            mkdir(f"1_data/{folder}/{period}/results")
+            if exists(f"1_data/{folder}/{period}/data_base"):
+                rmtree(f"1_data/{folder}/{period}/data_base")
+                mkdir(f"1_data/{folder}/{period}/data_base")
         
-        else:
-            mkdir(f"1_data/{folder}/{period}/results")
+            else:
+                mkdir(f"1_data/{folder}/{period}/data_base")
         
-        # independent variables forecast
-        db_indep_fore = Data_input()
+            # results are kept (unchanged figures and reports are skipped)
+            if not exists(f"1_data/{folder}/{period}/results"):
+                mkdir(f"1_data/{folder}/{period}/results")
         
-        data_all_fore = db_indep_fore.data_input_forecast(
+            # independent variables forecast
+            db_indep_fore = Data_input()
+        
+            data_all_fore = db_indep_fore.data_input_forecast(
             
-            folder,
-            period
+                folder,
+                period
             
-        )
+            )
         
-        data_all = data_all_fore[(data_all_fore.index <= date_train_end)]
+            data_all = data_all_fore[(data_all_fore.index <= date_train_end)]
         
-        # auto arima model
-        auto_arima = Arima_indep(
-            
-            data_all,
-            tickers_dict[folder][period]['dependent_variable'],
-            folder,
-            period,
-            date_predict_init,
-            date_predict_end,
-            tickers_dict[folder][period]['freq'],
-            tickers_dict[folder][period]['p_value_accepted']
+            # independent variables forecast engine
+            indep_engine = tickers_dict[folder][period].get('indep_engine', 'arima')
             
-        )
-        
-        auto_arima.auto_arima_model(
+            if indep_engine in ['var', 'vecm']:
+                
+                # var / vecm model (all variables in one model)
+                var_model = Var_indep(
+                
+                    data_all,
+                    tickers_dict[folder][period]['dependent_variable'],
+                    folder,
+                    period,
+                    date_predict_init,
+                    date_predict_end,
+                    tickers_dict[folder][period]['freq'],
+                    tickers_dict[folder][period]['p_value_accepted'],
+                    kind = indep_engine
+                
+                )
+                
+                data_f_pred = var_model.var_model(
+                
+                    tickers_dict[folder][period]['model_parameters'][6]
+                
+                )
             
-            tickers_dict[folder][period]['model_parameters'][6]
+            else:
+                
+                # auto arima model
+                auto_arima = Arima_indep(
+                
+                    data_all,
+                    tickers_dict[folder][period]['dependent_variable'],
+                    folder,
+                    period,
+                    date_predict_init,
+                    date_predict_end,
+                    tickers_dict[folder][period]['freq'],
+                    tickers_dict[folder][period]['p_value_accepted'],
+                    seasonality = tickers_dict[folder][period].get('indep_seasonality', 'fixed')
+                
+                )
             
-        )
-        
-        #data model input
-        db = Data_input()
-        data_endog, data_exogs, variable, data_original, data_train = db.data_input(folder, period)
+                data_f_pred = auto_arima.auto_arima_model(
+                
+                    tickers_dict[folder][period]['model_parameters'][6]
+                
+                )
         
-        # Time_serie_level (descriptive statistics)
-        descriptive_statistics = Time_serie_level(
+            #data model input (forecast and history handed over in memory)
+            data_endog, data_exogs, variable, data_original, data_train = db_indep_fore.data_input(
                 
-                data_endog,
                 folder,
                 period,
-                tickers_dict[folder][period]['ylabel'],
-                date_train_end,
-                tickers_dict[folder][period]['style_graph'],
-                tickers_dict[folder][period]['color1'],
-                tickers_dict[folder][period]['color2'],
-                tickers_dict[folder][period]['color3'],
-                tickers_dict[folder][period]['color4'],
-                tickers_dict[folder][period]['color5'],
+                data_f_pred,
+                data_all_fore
+                
+            )
+        
+            # x13-arima-seats runs (background, overlap the descriptive statistics)
+            if tickers_dict[folder][period]['freq'] == 'MS':
             
-        )
+                x13_desaz = X13_arima_desaz(
+                
+                    data_endog, 
+                    data_exogs,
+                    folder,
+                    period,
+                    tickers_dict[folder][period]['ylabel'],
+                    path_x13_arima,
+                    tickers_dict[folder][period]['freq'],
+                    date_train_init,
+                    date_train_end,
+                    date_predict_end,
+                    tickers_dict[folder][period]['style_graph'],
+                    tickers_dict[folder][period]['color1'],
+                    tickers_dict[folder][period]['color2'],
+                    tickers_dict[folder][period]['color3'],
+                    tickers_dict[folder][period]['color4'],
+                    tickers_dict[folder][period]['color5'],
+                    tickers_dict[folder][period]['seas_adjust_engine'],
+                
+                )
+                
+                x13_desaz.x13_submit()
         
-        descriptive_statistics.time_serie_plot()
+            # Time_serie_level (descriptive statistics)
+            descriptive_statistics = Time_serie_level(
+                
+                    data_endog,
+                    folder,
+                    period,
+                    tickers_dict[folder][period]['ylabel'],
+                    date_train_end,
+                    tickers_dict[folder][period]['style_graph'],
+                    tickers_dict[folder][period]['color1'],
+                    tickers_dict[folder][period]['color2'],
+                    tickers_dict[folder][period]['color3'],
+                    tickers_dict[folder][period]['color4'],
+                    tickers_dict[folder][period]['color5'],
+            
+            )
         
-        if tickers_dict[folder][period]['freq'] == 'MS':
-            descriptive_statistics.moving_average_m()
-
-        if tickers_dict[folder][period]['freq'] == 'D':
-            descriptive_statistics.moving_average_d()
-
-        descriptive_statistics.acf_pacf_plot()
-        descriptive_statistics.periodogram_plot()
-        descriptive_statistics.descriptive_stat()
+            if not headless:
+                descriptive_statistics.time_serie_plot()
         
-        # seasonality
-        # x13-arima-seats
-        if tickers_dict[folder][period]['freq'] == 'MS':
-            
-            x13_desaz = X13_arima_desaz(
+            descriptive_statistics.moving_average(
                 
-                data_endog, 
-                data_exogs,
-                folder,
-                period,
-                tickers_dict[folder][period]['ylabel'],
-                path_x13_arima,
-                tickers_dict[folder][period]['freq'],
-                date_train_init,
-                date_train_end,
-                date_predict_end,
-                tickers_dict[folder][period]['style_graph'],
-                tickers_dict[folder][period]['color1'],
-                tickers_dict[folder][period]['color2'],
-                tickers_dict[folder][period]['color3'],
-                tickers_dict[folder][period]['color4'],
-                tickers_dict[folder][period]['color5'],
+                tickers_dict[folder][period]['ma_windows'],
+                tickers_dict[folder][period]['ema_spans'],
+                tickers_dict[folder][period]['std_windows']
                 
             )
+
+            descriptive_statistics.acf_pacf_plot()
+            descriptive_statistics.periodogram_plot()
+            descriptive_statistics.descriptive_stat()
+        
+            # seasonality
+            # x13-arima-seats
+            if tickers_dict[folder][period]['freq'] == 'MS':
             
-            x13_desaz.x13_results()
-            x13_desaz.x13_seasonal_adjustment()
-            x13_desaz.independent_desaz_x13()
+                if not headless:
+                    x13_desaz.x13_results()
+                
+                x13_desaz.x13_seasonal_adjustment()
+                x13_desaz.independent_desaz_x13()
         
-        else:
+            else:
             
-            data_d = concat([data_endog, data_exogs], axis=1)
+                data_d = concat([data_endog, data_exogs], axis=1)
             
-            data_d.to_csv(
+                data_d.to_csv(
                 
-                f"1_data/{folder}/{period}/data_base/{folder}_seasonal_adjustment_{period}.csv"
+                    f"1_data/{folder}/{period}/data_base/{folder}_seasonal_adjustment_{period}.csv"
                 
-            )
+                )
         
-        # stationarity
-        try:
-            data_non_seasonal = read_csv(
+            # stationarity
+            try:
+                data_non_seasonal = read_csv(
                 
-                f"1_data/{folder}/{period}/data_base/{folder}_seasonal_adjustment_{period}.csv",
-                sep=",",
-                decimal="."
+                    f"1_data/{folder}/{period}/data_base/{folder}_seasonal_adjustment_{period}.csv",
+                    sep=",",
+                    decimal="."
                 
-            )
+                )
             
-            data_non_seasonal["index_date"] = to_datetime(data_non_seasonal["index_date"])
-            data_non_seasonal = data_non_seasonal.sort_values("index_date")
-            data_non_seasonal = data_non_seasonal.set_index("index_date")
+                data_non_seasonal["index_date"] = to_datetime(data_non_seasonal["index_date"])
+                data_non_seasonal = data_non_seasonal.sort_values("index_date")
+                data_non_seasonal = data_non_seasonal.set_index("index_date")
         
-        except Exception as erro:
-            print(erro)
-            exit()
+            except Exception as erro:
+                print(erro)
+                exit()
         
-        stationarity = Stationarity_diff(
+            stationarity = Stationarity_diff(
             
-            data_non_seasonal,
-            folder,
-            period,
-            tickers_dict[folder][period]['p_value_accepted']
+                data_non_seasonal,
+                folder,
+                period,
+                tickers_dict[folder][period]['p_value_accepted']
             
-        )
+            )
         
-        stationarity.adf_teste()
-        stationarity.diff_data()
-        stationarity.independent_var_stationarity()
+            stationarity.adf_teste()
+            stationarity.diff_data()
+            stationarity.independent_var_stationarity()
         
-        # model execute 
-        # open stationary data
-        try:
-            data_stationarity = read_csv(
+            # model execute 
+            # open stationary data
+            try:
+                data_stationarity = read_csv(
                 
-                f"1_data/{folder}/{period}/data_base/{folder}_stationary_{period}.csv",
-                sep=",",
-                decimal="."
+                    f"1_data/{folder}/{period}/data_base/{folder}_stationary_{period}.csv",
+                    sep=",",
+                    decimal="."
              
-            )
+                )
             
-            data_stationarity["index_date"] = to_datetime(data_stationarity["index_date"])
-            data_stationarity = data_stationarity.sort_values("index_date")
-            data_stationarity = data_stationarity.set_index("index_date")
+                data_stationarity["index_date"] = to_datetime(data_stationarity["index_date"])
+                data_stationarity = data_stationarity.sort_values("index_date")
+                data_stationarity = data_stationarity.set_index("index_date")
             
-            data_stationarity = data_stationarity[
+                data_stationarity = data_stationarity[
                 
-                (data_stationarity.index >= date_train_init) & 
-                (data_stationarity.index <= date_predict_end)
+                    (data_stationarity.index >= date_train_init) & 
+                    (data_stationarity.index <= date_predict_end)
                 
-            ]
+                ]
         
-        except Exception as erro:
-            print(erro)
-            exit()
+            except Exception as erro:
+                print(erro)
+                exit()
         
         
-        # endogenous
-        data_non_seasonal_endog = read_csv(
+            # endogenous
+            data_non_seasonal_endog = read_csv(
             
-            f"1_data/{folder}/{period}/data_base/{folder}_seasonal_adjustment_{period}.csv", 
-            sep=",",
-            decimal="."
+                f"1_data/{folder}/{period}/data_base/{folder}_seasonal_adjustment_{period}.csv", 
+                sep=",",
+                decimal="."
             
-        )
+            )
         
-        data_non_seasonal_endog["index_date"] = to_datetime(data_non_seasonal_endog["index_date"])
-        data_non_seasonal_endog = data_non_seasonal_endog.sort_values("index_date")
-        data_non_seasonal_endog = data_non_seasonal_endog.set_index("index_date")
+            data_non_seasonal_endog["index_date"] = to_datetime(data_non_seasonal_endog["index_date"])
+            data_non_seasonal_endog = data_non_seasonal_endog.sort_values("index_date")
+            data_non_seasonal_endog = data_non_seasonal_endog.set_index("index_date")
         
-        data_non_seasonal_endog = data_non_seasonal_endog[
+            data_non_seasonal_endog = data_non_seasonal_endog[
             
-            (data_non_seasonal_endog.index >= date_train_init) &
-            (data_non_seasonal_endog.index <= date_predict_end)
+                (data_non_seasonal_endog.index >= date_train_init) &
+                (data_non_seasonal_endog.index <= date_predict_end)
             
-        ]
+            ]
         
-        data_dummy = DataFrame()
+            data_dummy = DataFrame()
         
-        # dummy variable
-        for dummy in tickers_dict[folder][period]['dummy'].keys():
+            # dummy variable
+            for dummy in tickers_dict[folder][period]['dummy'].keys():
             
-            if tickers_dict[folder][period]['dummy'][dummy]['type'] == 'range':
+                if tickers_dict[folder][period]['dummy'][dummy]['type'] == 'range':
                 
-                dm_range = Dummy_generator(
+                    dm_range = Dummy_generator(
                     
-                    tickers_dict[folder][period]['date_train_init'],
-                    tickers_dict[folder][period]['date_predict_end'],
-                    tickers_dict[folder][period]['freq']
+                        tickers_dict[folder][period]['date_train_init'],
+                        tickers_dict[folder][period]['date_predict_end'],
+                        tickers_dict[folder][period]['freq']
                     
-                )
+                    )
                 
-                data_dummy[dummy] = dm_range.dummy_generator_range(
+                    data_dummy[dummy] = dm_range.dummy_generator_range(
                     
-                    dummy,
-                    tickers_dict[folder][period]['dummy'][dummy]['start'],
-                    tickers_dict[folder][period]['dummy'][dummy]['end']
+                        dummy,
+                        tickers_dict[folder][period]['dummy'][dummy]['start'],
+                        tickers_dict[folder][period]['dummy'][dummy]['end']
                     
-                )
+                    )
         
-        # data frame model
-        try:
+            # data frame model
+            try:
             
-            data_model = concat(
+                data_model = concat(
                 
-                [
+                    [
                     
-                    data_non_seasonal_endog.iloc[ : , 0 ],
-                    data_stationarity.iloc[ : , 1: ], 
-                    data_dummy
+                        data_non_seasonal_endog.iloc[ : , 0 ],
+                        data_stationarity.iloc[ : , 1: ], 
+                        data_dummy
                     
-                ], 
+                    ], 
                 
-                axis=1
+                    axis=1
                 
-            )
+                )
         
-        except:
+            except:
             
-            data_model = concat(
+                data_model = concat(
                 
-                [
+                    [
                     
-                    data_non_seasonal_endog.iloc[ : , 0 ],
-                    data_stationarity.iloc[ : , 1: ]
+                        data_non_seasonal_endog.iloc[ : , 0 ],
+                        data_stationarity.iloc[ : , 1: ]
                     
-                ], 
+                    ], 
                 
-                axis=1
+                    axis=1
                 
-            )
+                )
         
-        data_model = data_model[ (data_model.index <= date_train_end) ].dropna()
+            data_model = data_model[ (data_model.index <= date_train_end) ].dropna()
         
-        # final data frame for the forecast
-        data_exogs_fore = concat(
+            # final data frame for the forecast
+            data_exogs_fore = concat(
             
-            [
+                [
                 
-                data_stationarity[(data_stationarity.index > date_train_end)],
-                data_dummy[(data_dummy.index > date_train_end)]
+                    data_stationarity[(data_stationarity.index > date_train_end)],
+                    data_dummy[(data_dummy.index > date_train_end)]
                 
-            ],
+                ],
             
-            axis=1
+                axis=1
             
-        )
+            )
         
-        # model execute
-        model = Model_execute(
+            # model execute
+            model = Model_execute(
             
-            data_original,
-            data_model,
-            data_exogs_fore,
-            folder,
-            period,
-            tickers_dict[folder][period]['ylabel'],
-            tickers_dict[folder][period]['style_graph'],
-            tickers_dict[folder][period]['color1'],
-            tickers_dict[folder][period]['color2'],
-            tickers_dict[folder][period]['color3'],
-            tickers_dict[folder][period]['color4'],
-            tickers_dict[folder][period]['color5'],
+                data_original,
+                data_model,
+                data_exogs_fore,
+                folder,
+                period,
+                tickers_dict[folder][period]['ylabel'],
+                tickers_dict[folder][period]['style_graph'],
+                tickers_dict[folder][period]['color1'],
+                tickers_dict[folder][period]['color2'],
+                tickers_dict[folder][period]['color3'],
+                tickers_dict[folder][period]['color4'],
+                tickers_dict[folder][period]['color5'],
             
-        ) 
+            ) 
         
-        model.model_execute(
+            model.model_execute(
             
-            tickers_dict[folder][period]['model_parameters'][0],
-            tickers_dict[folder][period]['model_parameters'][1],
-            tickers_dict[folder][period]['model_parameters'][2],
-            tickers_dict[folder][period]['model_parameters'][3],
-            tickers_dict[folder][period]['model_parameters'][4],
-            tickers_dict[folder][period]['model_parameters'][5],
-            tickers_dict[folder][period]['model_parameters'][6],
+                tickers_dict[folder][period]['model_parameters'][0],
+                tickers_dict[folder][period]['model_parameters'][1],
+                tickers_dict[folder][period]['model_parameters'][2],
+                tickers_dict[folder][period]['model_parameters'][3],
+                tickers_dict[folder][period]['model_parameters'][4],
+                tickers_dict[folder][period]['model_parameters'][5],
+                tickers_dict[folder][period]['model_parameters'][6],
             
-        )
+            )
         
-        model.ts_residuals_plot()
-        model.dist_residual_analysis()
-        model.acf_pacf_residuals()
+            if not headless:
+                model.ts_residuals_plot()
+                model.dist_residual_analysis()
+            
+            model.acf_pacf_residuals()
         
-        if tickers_dict[folder][period]['freq'] == 'MS':
-            model.adjust_predict_m(date_predict_init)
+            if tickers_dict[folder][period]['freq'] == 'MS':
+                model.adjust_predict_m(date_predict_init)
         
-        if tickers_dict[folder][period]['freq'] == 'D':
-            model.adjust_predict_d(date_predict_init)
+            if tickers_dict[folder][period]['freq'] == 'D':
+                model.adjust_predict_d(date_predict_init)
+    
+    # outstanding figures
+    for erro in render_pool.wait():
+        print(erro)
+    
+    # outstanding csv artifacts (_fpred.csv)
+    for erro in artifact_wait():
+        print(erro)
+    
+    # headless check
+    if headless and matplotlib_loaded():
+        print("matplotlib was imported in a headless run")
+
 
+if __name__ == "__main__":
+    main()